@@ -4,8 +4,9 @@ Unit tests for the BaseConnection class.
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 import paramiko
+import socket
 
-from ztp_agent.network.switch.base.connection import BaseConnection
+from ztp_agent.network.switch.base.connection import BaseConnection, _BANNER_NUDGE_AFTER, _PROMPT_OR_LOGIN_RE
 
 
 class TestBaseConnection:
@@ -25,12 +26,27 @@ class TestBaseConnection:
         assert conn.ssh_client is None
         assert conn.shell is None
     
+    def test_debug_sink_bound_at_init(self, sample_switch_config):
+        """Test debug output goes to the callback only when debug is enabled."""
+        callback = Mock()
+        
+        quiet = BaseConnection(**sample_switch_config, debug_callback=callback)
+        quiet._dbg("hidden", "yellow")
+        callback.assert_not_called()
+        
+        config = dict(sample_switch_config, debug=True)
+        loud = BaseConnection(**config, debug_callback=callback)
+        loud._dbg("shown", "yellow")
+        callback.assert_called_once_with("shown", "yellow")
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
     @patch('ztp_agent.network.switch.base.connection.time.sleep')
     @patch('ztp_agent.network.switch.base.connection.paramiko.SSHClient')
-    def test_connect_success(self, mock_ssh_class, mock_sleep, sample_switch_config, mock_ssh_client):
+    def test_connect_success(self, mock_ssh_class, mock_sleep, mock_select, sample_switch_config, mock_ssh_client):
         """Test successful connection."""
         mock_client, mock_shell = mock_ssh_client
         mock_ssh_class.return_value = mock_client
+        mock_select.return_value = ([mock_shell], [], [])
         
         # Configure successful connection
         mock_shell.recv_ready.side_effect = [True, False]  # First call returns True, then False to exit loop
@@ -43,7 +59,11 @@ class TestBaseConnection:
         assert conn.connected is True
         mock_client.connect.assert_called_once()
         mock_client.invoke_shell.assert_called_once()
-        mock_sleep.assert_called()  # Verify sleep was called but mocked
+        # Pagination is disabled with a single write instead of three round-trips
+        mock_shell.send.assert_called_once_with(b"enable\nskip-page-display\nexit\n")
+        mock_client.get_transport.return_value.sock.setsockopt.assert_any_call(
+            socket.IPPROTO_TCP, socket.TCP_NODELAY, 1
+        )
     
     @patch('ztp_agent.network.switch.base.connection.paramiko.SSHClient')
     @patch('ztp_agent.network.switch.base.connection.paramiko.AuthenticationException')
@@ -58,6 +78,35 @@ class TestBaseConnection:
         
         assert result is False
         assert conn.connected is False
+        # Both password attempts were made and the failed session was closed
+        assert mock_client.connect.call_count == 2
+        mock_client.close.assert_called()
+    
+    @patch('ztp_agent.network.switch.base.connection.paramiko.SSHClient')
+    def test_connect_unreachable_skips_second_password(self, mock_ssh_class, sample_switch_config):
+        """Test a network failure is not retried with the preferred password."""
+        mock_client = Mock()
+        mock_client.connect.side_effect = socket.timeout("timed out")
+        mock_ssh_class.return_value = mock_client
+        
+        conn = BaseConnection(**sample_switch_config)
+        result = conn.connect()
+        
+        assert result is False
+        mock_client.connect.assert_called_once()
+    
+    @patch('ztp_agent.network.switch.base.connection.paramiko.SSHClient')
+    def test_connect_shell_error_tries_preferred_password(self, mock_ssh_class, sample_switch_config):
+        """Test a socket error after the SSH connect does not skip the preferred password."""
+        mock_client = Mock()
+        mock_client.invoke_shell.side_effect = socket.timeout("timed out")
+        mock_ssh_class.return_value = mock_client
+        
+        conn = BaseConnection(**sample_switch_config)
+        result = conn.connect()
+        
+        assert result is False
+        assert mock_client.connect.call_count == 2
     
     def test_disconnect(self, sample_switch_config, mock_ssh_client):
         """Test disconnection."""
@@ -67,10 +116,12 @@ class TestBaseConnection:
         conn.ssh_client = mock_client
         conn.shell = mock_shell
         conn.connected = True
+        conn.session_cache()['trace_l2'] = (0.0, set(), {'609c.9f1d.1a2b': '192.168.1.9'})
         
         conn.disconnect()
         
         assert conn.connected is False
+        assert conn.session_cache() == {}
         assert conn.ssh_client is None
         assert conn.shell is None
         mock_shell.close.assert_called_once()
@@ -85,11 +136,12 @@ class TestBaseConnection:
         assert success is False
         assert "Not connected" in output
     
+    @patch('ztp_agent.network.switch.base.connection.select.select')
     @patch('ztp_agent.network.switch.base.connection.time.sleep')
-    def test_run_command_success(self, mock_sleep, sample_switch_config, mock_ssh_client):
+    def test_run_command_success(self, mock_sleep, mock_select, sample_switch_config, mock_ssh_client):
         """Test successful command execution."""
         mock_client, mock_shell = mock_ssh_client
-        mock_shell.recv_ready.side_effect = [True, False]  # Exit loop after one iteration
+        mock_select.return_value = ([mock_shell], [], [])
         mock_shell.recv.return_value = b"Command output\nICX7250-48P>\n"
         
         conn = BaseConnection(**sample_switch_config)
@@ -101,16 +153,170 @@ class TestBaseConnection:
         
         assert success is True
         assert "Command output" in output
-        mock_shell.send.assert_called_with("show version\n")
+        mock_shell.send.assert_called_with(b"show version\n")
+    
+    def test_run_exec_command_reads_until_close(self, sample_switch_config, mock_ssh_client):
+        """Test exec-channel commands read to EOF on the shared transport."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_channel = Mock()
+        mock_channel.makefile.return_value.read.return_value = b"SW: Version 08.0.95hT213\r\n"
+        mock_channel.recv_exit_status.return_value = 0
+        mock_client.get_transport.return_value.open_session.return_value = mock_channel
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.ssh_client = mock_client
+        conn.shell = mock_shell
+        conn.connected = True
+        
+        success, output = conn.run_exec_command("show version")
+        
+        assert success is True
+        assert output == "SW: Version 08.0.95hT213\r\n"
+        mock_channel.exec_command.assert_called_once_with("show version")
+        mock_channel.close.assert_called_once()
+        mock_shell.send.assert_not_called()
+    
+    def test_run_exec_commands_multiplexes_channels(self, sample_switch_config, mock_ssh_client):
+        """Test independent commands are all started before any output is read."""
+        mock_client, mock_shell = mock_ssh_client
+        events = []
+        
+        def make_channel(output):
+            channel = Mock()
+            channel.exec_command.side_effect = lambda cmd: events.append(("exec", cmd))
+            channel.makefile.return_value.read.side_effect = lambda: events.append(("read", output)) or output
+            channel.recv_exit_status.return_value = 0
+            return channel
+        
+        channels = [make_channel(b"version"), make_channel(b"Invalid input -> inventory")]
+        mock_client.get_transport.return_value.open_session.side_effect = channels
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.ssh_client = mock_client
+        conn.connected = True
+        
+        results = conn.run_exec_commands(["show version", "show inventory"])
+        
+        assert results == [(True, "version"), (False, "Invalid input -> inventory")]
+        assert [kind for kind, _ in events] == ["exec", "exec", "read", "read"]
+        for channel in channels:
+            channel.close.assert_called_once()
+    
+    def test_run_readonly_commands_fall_back_to_shell(self, sample_switch_config):
+        """Test commands whose exec channel failed are retried in one shell batch."""
+        conn = BaseConnection(**sample_switch_config)
+        conn.run_exec_commands = Mock(return_value=[
+            (True, "SW: Version 08.0.95hT213\n"),
+            (False, "Error: exec refused"),
+            (False, "Error: exec refused"),
+        ])
+        conn.run_commands = Mock(return_value=[(True, "chassis"), (True, "hostname")])
+        
+        results = conn.run_readonly_commands(["show version", "show chassis", "show running-config"])
+        
+        assert results == [(True, "SW: Version 08.0.95hT213\n"), (True, "chassis"), (True, "hostname")]
+        conn.run_commands.assert_called_once_with(["show chassis", "show running-config"])
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    @patch('ztp_agent.network.switch.base.connection.time.sleep')
+    def test_run_command_incomplete_command(self, mock_sleep, mock_select, sample_switch_config, mock_ssh_client):
+        """Test that an incomplete command is reported as a failure."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.return_value = ([mock_shell], [], [])
+        mock_shell.recv.return_value = b"vlan\r\nIncomplete command.\r\nICX7250-48P(config)#"
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        conn.connected = True
+        
+        success, output = conn.run_command("vlan")
+        
+        assert success is False
+        assert "Incomplete command" in output
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    def test_run_command_error_reply(self, mock_select, sample_switch_config, mock_ssh_client):
+        """Test that an "Error -" reply is reported as a failure."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.return_value = ([mock_shell], [], [])
+        mock_shell.recv.return_value = b"interface ve 10\r\nError - VE 10 does not exist\r\nICX7250-48P(config)#"
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        conn.connected = True
+        
+        success, output = conn.run_command("interface ve 10")
+        
+        assert success is False
+        assert "Error - VE 10" in output
     
+    @patch('ztp_agent.network.switch.base.connection.select.select')
     @patch('ztp_agent.network.switch.base.connection.time.sleep')
-    def test_enter_config_mode_success(self, mock_sleep, sample_switch_config, mock_ssh_client):
+    def test_run_command_waits_for_prompt(self, mock_sleep, mock_select, sample_switch_config, mock_ssh_client):
+        """Test that output is read until the prompt arrives, skipping idle waits."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.side_effect = [([], [], []), ([mock_shell], [], []), ([mock_shell], [], [])]
+        mock_shell.recv.side_effect = [b"Command output\n", b"ICX7250-48P>"]
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.ssh_client = mock_client
+        conn.shell = mock_shell
+        conn.connected = True
+        
+        success, output = conn.run_command("show version")
+        
+        assert success is True
+        assert output == "Command output\nICX7250-48P>"
+        assert mock_shell.recv.call_count == 2
+        mock_sleep.assert_not_called()
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    def test_run_command_prompt_split_across_reads(self, mock_select, sample_switch_config, mock_ssh_client):
+        """Test a prompt arriving in two reads ends the command."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.return_value = ([mock_shell], [], [])
+        mock_shell.recv.side_effect = [b"show clock\r\n10:00:00\r\nICX7250-48", b"P#", b"\r\n"]
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        conn.connected = True
+        
+        success, output = conn.run_command("show clock")
+        
+        assert success is True
+        assert mock_shell.recv.call_count == 2
+        assert conn._last_prompt == "ICX7250-48P#"
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    def test_run_command_timeout_interrupts(self, mock_select, sample_switch_config, mock_ssh_client):
+        """Test a command that never returns a prompt is interrupted to recover the shell."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_shell.recv.side_effect = [b"--More--", b"^C\r\nICX7250-48P#"]
+        # The pager output arrives, then nothing more until the interrupt is sent
+        mock_select.side_effect = lambda *args: (
+            ([mock_shell], [], []) if mock_shell.recv.call_count == 0 or mock_shell.send.call_count == 2
+            else ([], [], [])
+        )
+        
+        conn = BaseConnection(**dict(sample_switch_config, timeout=0.05))
+        conn.shell = mock_shell
+        conn.connected = True
+        
+        conn.run_command("show running-config")
+        
+        mock_shell.send.assert_called_with(b"\x03\n")
+        assert conn._last_prompt == "ICX7250-48P#"
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    @patch('ztp_agent.network.switch.base.connection.time.sleep')
+    def test_enter_config_mode_success(self, mock_sleep, mock_select, sample_switch_config, mock_ssh_client):
         """Test entering configuration mode successfully."""
         mock_client, mock_shell = mock_ssh_client
-        # Use cycle to provide infinite True, False pattern for multiple commands
-        from itertools import cycle
-        mock_shell.recv_ready.side_effect = cycle([True, False])
-        mock_shell.recv.return_value = b"Entering configuration mode\nICX7250-48P(config)>\n"
+        mock_select.return_value = ([mock_shell], [], [])
+        mock_shell.recv.side_effect = [
+            b"enable\r\nICX7250-48P#",
+            b"configure terminal\r\nICX7250-48P(config)#",
+        ]
         
         conn = BaseConnection(**sample_switch_config)
         conn.ssh_client = mock_client
@@ -120,10 +326,106 @@ class TestBaseConnection:
         result = conn.enter_config_mode()
         
         assert result is True
-        mock_shell.send.assert_called_with("configure terminal\n")
+        # enable and configure terminal are sent as a single batch
+        mock_shell.send.assert_called_once_with(b"enable\nconfigure terminal\n")
     
+    @patch('ztp_agent.network.switch.base.connection.select.select')
     @patch('ztp_agent.network.switch.base.connection.time.sleep')
-    def test_exit_config_mode_with_save(self, mock_sleep, sample_switch_config, mock_ssh_client):
+    def test_enter_config_mode_uses_last_prompt(self, mock_sleep, mock_select, sample_switch_config, mock_ssh_client):
+        """Test enter_config_mode skips mode changes the last prompt shows are done."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.return_value = ([mock_shell], [], [])
+        mock_shell.recv.return_value = b"configure terminal\r\nICX7250-48P(config)#"
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        conn.connected = True
+        
+        # Already in enable mode: only configure terminal is sent
+        conn._last_prompt = "ICX7250-48P#"
+        assert conn.enter_config_mode() is True
+        mock_shell.send.assert_called_once_with(b"configure terminal\n")
+        assert conn._last_prompt == "ICX7250-48P(config)#"
+        
+        # Already in configuration mode: nothing is sent
+        mock_shell.send.reset_mock()
+        assert conn.enter_config_mode() is True
+        mock_shell.send.assert_not_called()
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    def test_run_commands_splits_output(self, mock_select, sample_switch_config, mock_ssh_client):
+        """Test batched commands are sent once and output is split per command."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.return_value = ([mock_shell], [], [])
+        mock_shell.recv.side_effect = [
+            b"interface ethernet 1/1/1\r\nICX7250-48P(config-if-e1000-1/1/1)#",
+            b"bogus\r\nInvalid input -> bogus\r\nICX7250-48P(config-if-e1000-1/1/1)#",
+        ]
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        conn.connected = True
+        
+        results = conn.run_commands(["interface ethernet 1/1/1", "bogus"])
+        
+        mock_shell.send.assert_called_once_with(b"interface ethernet 1/1/1\nbogus\n")
+        assert results[0] == (True, "interface ethernet 1/1/1\r\nICX7250-48P(config-if-e1000-1/1/1)#")
+        assert results[1][0] is False
+        assert "Invalid input" in results[1][1]
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    def test_run_commands_repeated_last_command(self, mock_select, sample_switch_config, mock_ssh_client):
+        """Test a batch ending in a repeated command waits for its final echo."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.return_value = ([mock_shell], [], [])
+        mock_shell.recv.side_effect = [
+            b"vlan 10 name M\r\nICX7250-48P(config-vlan-10)#exit\r\nICX7250-48P(config)#",
+            b"vlan 20 name W\r\nICX7250-48P(config-vlan-20)#",
+            b"exit\r\nICX7250-48P(config)#",
+        ]
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        conn.connected = True
+        
+        results = conn.run_commands(["vlan 10 name M", "exit", "vlan 20 name W", "exit"])
+        
+        assert mock_shell.recv.call_count == 3
+        assert results[2] == (True, "vlan 20 name W\r\nICX7250-48P(config-vlan-20)#")
+        assert results[3] == (True, "exit\r\nICX7250-48P(config)#")
+        assert conn._last_prompt == "ICX7250-48P(config)#"
+    
+    def test_run_commands_wrapped_echo_ends_when_quiet(self, sample_switch_config, mock_ssh_client):
+        """Test a batch whose echo the switch wrapped ends once the prompt goes quiet."""
+        mock_client, mock_shell = mock_ssh_client
+        clock = [0.0]
+        mock_shell.recv.side_effect = [
+            b"vlan-config add tagged-vl\r\nan 10 20 30\r\nICX7250-48P(config-if-e1000-1/1/5)#",
+        ]
+        
+        def fake_select(rlist, wlist, xlist, wait):
+            if mock_shell.recv.call_count == 0:
+                return [mock_shell], [], []
+            clock[0] += wait
+            return [], [], []
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        conn.connected = True
+        
+        with patch('ztp_agent.network.switch.base.connection.select.select', side_effect=fake_select), \
+             patch('ztp_agent.network.switch.base.connection.time.monotonic', side_effect=lambda: clock[0]):
+            results = conn.run_commands(["vlan-config add tagged-vlan 10 20 30"])
+        
+        assert results[0][0] is True
+        # Done about a second after the prompt, with no Ctrl-C recovery
+        assert clock[0] <= 1.5
+        mock_shell.send.assert_called_once()
+        assert conn._last_prompt == "ICX7250-48P(config-if-e1000-1/1/5)#"
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    @patch('ztp_agent.network.switch.base.connection.time.sleep')
+    def test_exit_config_mode_with_save(self, mock_sleep, mock_select, sample_switch_config, mock_ssh_client):
         """Test exiting configuration mode with save."""
         mock_client, mock_shell = mock_ssh_client
         
@@ -135,9 +437,7 @@ class TestBaseConnection:
                 return b"Configuration saved\nICX7250-48P>\n"
         
         mock_shell.recv.side_effect = mock_recv
-        # Use cycle for infinite alternating pattern to handle multiple commands
-        from itertools import cycle
-        mock_shell.recv_ready.side_effect = cycle([True, False])
+        mock_select.return_value = ([mock_shell], [], [])
         
         conn = BaseConnection(**sample_switch_config)
         conn.ssh_client = mock_client
@@ -149,10 +449,95 @@ class TestBaseConnection:
         assert result is True
         assert mock_shell.send.call_count == 3  # exit config + write memory + exit enable
     
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    def test_exit_config_mode_from_enable_mode(self, mock_select, sample_switch_config, mock_ssh_client):
+        """Test the config-mode exit is skipped when the prompt shows enable mode."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.return_value = ([mock_shell], [], [])
+        mock_shell.recv.side_effect = [
+            b"write memory\r\nWrite startup-config done.\r\nICX7250-48P#",
+            b"exit\r\nICX7250-48P>",
+        ]
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        conn.connected = True
+        conn._last_prompt = "ICX7250-48P#"
+        
+        assert conn.exit_config_mode(save=True) is True
+        assert [c.args[0] for c in mock_shell.send.call_args_list] == [b"write memory\n", b"exit\n"]
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    def test_deferred_saves_flush_once(self, mock_select, sample_switch_config, mock_ssh_client):
+        """Test deferred saves are committed by a single write memory."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.return_value = ([mock_shell], [], [])
+        mock_shell.recv.side_effect = [
+            b"exit\r\nICX7250-48P#",
+            b"exit\r\nICX7250-48P>",
+            b"enable\r\nICX7250-48P#write memory\r\nICX7250-48P#exit\r\nICX7250-48P>",
+        ]
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        conn.connected = True
+        conn.defer_saves = True
+        conn._last_prompt = "ICX7250-48P(config)#"
+        
+        assert conn.exit_config_mode(save=True) is True
+        assert b"write memory\n" not in [c.args[0] for c in mock_shell.send.call_args_list]
+        
+        assert conn.flush_config() is True
+        mock_shell.send.assert_called_with(b"enable\nwrite memory\nexit\n")
+        assert conn.flush_config() is True  # Nothing left to save
+        assert mock_shell.send.call_count == 3
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    def test_reset_session_returns_to_exec_mode(self, mock_select, sample_switch_config, mock_ssh_client):
+        """Test a session left in config mode is saved and returned to user mode."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.return_value = ([mock_shell], [], [])
+        mock_shell.recv.side_effect = [
+            b"write memory\r\nICX7250-48P(config-if-e1000-1/1/1)#",
+            b"end\r\nICX7250-48P#exit\r\nICX7250-48P>",
+        ]
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        conn.connected = True
+        conn.defer_saves = True
+        conn._config_dirty = True
+        conn._last_prompt = "ICX7250-48P(config-if-e1000-1/1/1)#"
+        
+        assert conn.reset_session() is True
+        assert [c.args[0] for c in mock_shell.send.call_args_list] == [b"write memory\n", b"end\nexit\n"]
+        assert conn.defer_saves is False
+        assert conn._last_prompt == "ICX7250-48P>"
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    def test_exit_config_mode_from_interface_level(self, mock_select, sample_switch_config, mock_ssh_client):
+        """Test a nested config level is left with a single end."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.return_value = ([mock_shell], [], [])
+        mock_shell.recv.side_effect = [
+            b"end\r\nICX7250-48P#",
+            b"exit\r\nICX7250-48P>",
+        ]
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        conn.connected = True
+        conn._last_prompt = "ICX7250-48P(config-if-e1000-1/1/1)#"
+        
+        assert conn.exit_config_mode(save=False) is True
+        assert [c.args[0] for c in mock_shell.send.call_args_list] == [b"end\n", b"exit\n"]
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
     @patch('ztp_agent.network.switch.base.connection.time.sleep')
-    def test_context_manager(self, mock_sleep, sample_switch_config, mock_ssh_client):
+    def test_context_manager(self, mock_sleep, mock_select, sample_switch_config, mock_ssh_client):
         """Test using BaseConnection as context manager."""
         mock_client, mock_shell = mock_ssh_client
+        mock_select.return_value = ([mock_shell], [], [])
         mock_shell.recv_ready.side_effect = [True, False]
         mock_shell.recv.return_value = b"ICX7250-48P>\n"
         
@@ -165,6 +550,88 @@ class TestBaseConnection:
             mock_shell.close.assert_called()
             mock_client.close.assert_called()
     
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    @patch('ztp_agent.network.switch.base.connection.time.sleep')
+    def test_handle_first_time_login_waits_for_prompts(self, mock_sleep, mock_select,
+                                                       sample_switch_config, mock_ssh_client):
+        """Test the password change returns once each prompt arrives, without fixed sleeps."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.return_value = ([mock_shell], [], [])
+        mock_shell.recv.side_effect = [b"Enter the reconfirm password:", b"\r\nICX7250-48P>"]
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        
+        result = conn._handle_first_time_login("Enter new password:")
+        
+        assert result == "Enter new password:\r\nICX7250-48P>"
+        assert conn.password == "newpassword"
+        assert mock_shell.send.call_count == 2
+        mock_sleep.assert_not_called()
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    def test_wait_for_pattern_returns_on_prompt(self, mock_select, sample_switch_config, mock_ssh_client):
+        """Test that the initial wait returns as soon as a prompt arrives."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.return_value = ([mock_shell], [], [])
+        mock_shell.recv.side_effect = [b"Welcome banner\r\n", b"ICX7250-48P>"]
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        
+        output = conn._wait_for_pattern(_PROMPT_OR_LOGIN_RE, timeout=15)
+        
+        assert output == "Welcome banner\r\nICX7250-48P>"
+        assert mock_shell.recv.call_count == 2
+        mock_shell.send.assert_not_called()
+    
+    def test_banner_pattern_matches_only_at_end(self):
+        """Test the banner wait ends on first-login prompts but not on banner art."""
+        assert _PROMPT_OR_LOGIN_RE.search(b"Enter the new password for user super :")
+        assert _PROMPT_OR_LOGIN_RE.search(b"Enter new password: ")
+        assert _PROMPT_OR_LOGIN_RE.search(b"ICX7250-48P Router>\r\n")
+        assert not _PROMPT_OR_LOGIN_RE.search(b"##########\r\n")
+        assert not _PROMPT_OR_LOGIN_RE.search(b"ICX7250-48P>\r\nWelcome")
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    def test_wait_for_pattern_nudges_silent_switch(self, mock_select, sample_switch_config, mock_ssh_client):
+        """Test that a newline is sent when the switch stays silent."""
+        mock_client, mock_shell = mock_ssh_client
+        mock_select.side_effect = [([], [], []), ([mock_shell], [], [])]
+        mock_shell.recv.side_effect = [b"ICX7250-48P>"]
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        
+        output = conn._wait_for_pattern(_PROMPT_OR_LOGIN_RE, timeout=15, nudge_after=0.5)
+        
+        assert output == "ICX7250-48P>"
+        mock_shell.send.assert_called_once_with(b"\n")
+    
+    def test_wait_for_pattern_slow_password_prompt_not_nudged(self, sample_switch_config, mock_ssh_client):
+        """Test a first-login prompt arriving after a second is not answered with a newline."""
+        mock_client, mock_shell = mock_ssh_client
+        clock = [0.0]
+        
+        # The new password prompt shows up one second after the shell opens
+        def fake_select(rlist, wlist, xlist, wait):
+            if clock[0] + wait >= 1.0 and mock_shell.recv.call_count == 0:
+                clock[0] = 1.0
+                return [mock_shell], [], []
+            clock[0] += wait
+            return [], [], []
+        mock_shell.recv.side_effect = [b"Enter the new password for user super :"]
+        
+        conn = BaseConnection(**sample_switch_config)
+        conn.shell = mock_shell
+        
+        with patch('ztp_agent.network.switch.base.connection.select.select', side_effect=fake_select), \
+             patch('ztp_agent.network.switch.base.connection.time.monotonic', side_effect=lambda: clock[0]):
+            output = conn._wait_for_pattern(_PROMPT_OR_LOGIN_RE, timeout=15, nudge_after=_BANNER_NUDGE_AFTER)
+        
+        assert output == "Enter the new password for user super :"
+        mock_shell.send.assert_not_called()
+    
     def test_context_manager_connection_failure(self, sample_switch_config):
         """Test context manager when connection fails."""
         with patch('ztp_agent.network.switch.base.connection.paramiko.SSHClient') as mock_ssh_class:
@@ -0,0 +1,176 @@
+"""
+Unit tests for the SwitchConfiguration class.
+"""
+import pytest
+from unittest.mock import Mock, call, patch
+
+from ztp_agent.network.switch.base.connection import BaseConnection
+from ztp_agent.network.switch.configuration import SwitchConfiguration
+from ztp_agent.network.switch.enums import PoEStatus
+
+
+@pytest.fixture
+def configuration():
+    """SwitchConfiguration over a mock connection already able to enter config mode."""
+    connection = Mock()
+    connection.enter_config_mode.return_value = True
+    connection.exit_config_mode.return_value = True
+    connection.run_commands.side_effect = lambda commands: [(True, "") for _ in commands]
+    return SwitchConfiguration(connection)
+
+
+class TestSwitchConfiguration:
+    """Test cases for SwitchConfiguration class."""
+    
+    def test_configure_ap_port_vlan_list(self, configuration):
+        """Test all VLAN tags for an AP port are added with one list command."""
+        assert configuration.configure_ap_port("1/1/5", [20, 30], management_vlan=10) is True
+        
+        # The interface line is confirmed before the lines that depend on it
+        assert configuration.connection.run_commands.call_args_list == [
+            call(["interface ethernet 1/1/5"]),
+            call(["vlan-config add tagged-vlan 10 20 30", "exit"]),
+        ]
+        configuration.connection.run_command.assert_not_called()
+        configuration.connection.exit_config_mode.assert_called_once_with(save=True)
+    
+    def test_configure_ap_port_falls_back_per_vlan(self, configuration):
+        """Test firmware rejecting the VLAN list gets one line per VLAN instead."""
+        configuration.connection.run_commands.side_effect = lambda commands: [
+            (False, "Invalid input -> 20") if command.endswith(" 10 20") else (True, "")
+            for command in commands
+        ]
+        
+        assert configuration.configure_ap_port("1/1/5", [20], management_vlan=10) is True
+        
+        configuration.connection.run_commands.assert_called_with([
+            "vlan-config add tagged-vlan 10",
+            "vlan-config add tagged-vlan 20",
+            "exit",
+        ])
+        configuration.connection.exit_config_mode.assert_called_once_with(save=True)
+    
+    def test_configure_ap_port_rejected_interface_skips_fallback(self, configuration):
+        """Test the per-VLAN fallback is only tried when the VLAN list is rejected."""
+        configuration.connection.run_commands.side_effect = lambda commands: [
+            (False, "Error - invalid port") if command.startswith("interface") else (True, "")
+            for command in commands
+        ]
+        
+        assert configuration.configure_ap_port("1/1/99", [20], management_vlan=10) is False
+        
+        configuration.connection.run_commands.assert_called_once_with(["interface ethernet 1/1/99"])
+        configuration.connection.exit_config_mode.assert_called_once_with(save=False)
+    
+    def test_configure_ap_port_failure_discards(self, configuration):
+        """Test a failed line in the block leaves config mode without saving."""
+        configuration.connection.run_commands.side_effect = lambda commands: [
+            (False, "Invalid input -> tagged-vlan 20") if "20" in command else (True, "")
+            for command in commands
+        ]
+        
+        assert configuration.configure_ap_port("1/1/5", [20], management_vlan=10) is False
+        configuration.connection.exit_config_mode.assert_called_once_with(save=False)
+    
+    def test_apply_base_config_skips_comments(self, configuration):
+        """Test the base config is sent without blanks or comments, ending a write at each VLAN."""
+        base_config = "! base config\nvlan 10 name Management\n\n spanning-tree 802-1w\n exit\n"
+        
+        assert configuration.apply_base_config(base_config) is True
+        
+        assert configuration.connection.run_commands.call_args_list == [
+            call(["vlan 10 name Management"]),
+            call(["spanning-tree 802-1w", "exit"]),
+        ]
+    
+    def test_apply_base_config_bounded_blocks(self, configuration):
+        """Test a long base config is sent in bounded blocks, in order."""
+        lines = [f"snmp-server community c{n} ro" for n in range(1, 121)]
+        
+        assert configuration.apply_base_config("\n".join(lines)) is True
+        
+        sent = [call.args[0] for call in configuration.connection.run_commands.call_args_list]
+        assert [len(block) for block in sent] == [50, 50, 20]
+        assert sum(sent, []) == lines
+    
+    def test_apply_base_config_stops_on_rejected_line(self, configuration):
+        """Test a rejected base config line fails the step without saving."""
+        configuration.connection.run_commands.side_effect = lambda commands: [
+            (False, "Invalid input -> spanning-tree 802-1x") if command.startswith("spanning-tree") else (True, "")
+            for command in commands
+        ]
+        base_config = "vlan 10 name Management\nspanning-tree 802-1x\nexit\nvlan 20 name Wireless\n"
+        
+        assert configuration.apply_base_config(base_config) is False
+        
+        assert configuration.connection.run_commands.call_count == 2
+        configuration.connection.exit_config_mode.assert_called_once_with(save=False)
+    
+    @patch('ztp_agent.network.switch.base.connection.select.select')
+    def test_apply_base_config_reads_through_vlan_blocks(self, mock_select, sample_switch_config):
+        """Test each VLAN block is read up to its final prompt before the next is sent."""
+        shell = Mock()
+        mock_select.return_value = ([shell], [], [])
+        shell.recv.side_effect = [
+            b"configure terminal\r\nICX7250-48P(config)#",
+            b"vlan 10 name M\r\nICX7250-48P(config-vlan-10)#",
+            b"exit\r\nICX7250-48P(config)#vlan 20 name W\r\n",
+            b"ICX7250-48P(config-vlan-20)#",
+            b"exit\r\nICX7250-48P(config)#",
+            b"exit\r\nICX7250-48P#",
+            b"write memory\r\nICX7250-48P#",
+            b"exit\r\nICX7250-48P>",
+        ]
+        connection = BaseConnection(**sample_switch_config)
+        connection.shell = shell
+        connection.connected = True
+        connection._last_prompt = "ICX7250-48P#"
+        
+        base_config = "vlan 10 name M\nexit\nvlan 20 name W\nexit\n"
+        assert SwitchConfiguration(connection).apply_base_config(base_config) is True
+        
+        assert [call.args[0] for call in shell.send.call_args_list] == [
+            b"configure terminal\n",
+            b"vlan 10 name M\n",
+            b"exit\nvlan 20 name W\n",
+            b"exit\n",
+            b"exit\n",
+            b"write memory\n",
+            b"exit\n",
+        ]
+        # Every reply was consumed by the command it belongs to
+        assert connection._last_prompt == "ICX7250-48P>"
+    
+    def test_configure_super_user_password_rejected(self, configuration):
+        """Test a rejected password line leaves config mode without saving."""
+        configuration.connection.run_commands.side_effect = lambda commands: [
+            (False, "Error - password too short") for _ in commands
+        ]
+        
+        assert configuration.configure_super_user_password("x") is False
+        
+        configuration.connection.run_commands.assert_called_once_with(
+            ["username super password x", "username super privilege 0"]
+        )
+        configuration.connection.exit_config_mode.assert_called_once_with(save=False)
+    
+    def test_set_poe_status_interface_block(self, configuration):
+        """Test the lines of a PoE change follow the accepted interface line in one write."""
+        assert configuration.set_poe_status("1/1/5", PoEStatus.DISABLED) is True
+        
+        assert configuration.connection.run_commands.call_args_list == [
+            call(["interface ethernet 1/1/5"]),
+            call([f"inline power {PoEStatus.DISABLED.value}", "exit"]),
+        ]
+    
+    def test_configure_switch_basic_rejected_interface(self, configuration):
+        """Test interface lines are not sent once the interface itself is rejected."""
+        configuration.connection.run_commands.side_effect = lambda commands: [
+            (False, "Error - VE 10 does not exist") if command == "interface ve 10" else (True, "")
+            for command in commands
+        ]
+        
+        assert configuration.configure_switch_basic("sw1", 10, "192.168.10.2", "255.255.255.0") is False
+        
+        configuration.connection.run_commands.assert_called_once_with(["hostname sw1", "interface ve 10"])
+        configuration.connection.exit_config_mode.assert_called_once_with(save=False)
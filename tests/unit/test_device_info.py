@@ -18,6 +18,10 @@ class MockConnection(DeviceInfo):
     def run_command(self, command):
         """Mock run_command method."""
         return True, self._mock_output
+    
+    def run_readonly_command(self, command):
+        """Mock run_readonly_command method, sharing run_command's output."""
+        return self.run_command(command)
 
 
 class TestDeviceInfo:
@@ -120,6 +124,49 @@ class TestDeviceInfo:
         assert serial == "XYZ987654321"
         assert conn.serial == "XYZ987654321"
     
+    def test_get_model_and_serial_single_command(self, sample_version_output):
+        """Test that model and serial share one show version round-trip."""
+        conn = MockConnection()
+        conn.run_command = Mock(return_value=(True, sample_version_output))
+        
+        model = conn.get_model()
+        serial = conn.get_serial()
+        
+        assert model == "ICX7250-48P"
+        assert serial == "ABC123456789"
+        conn.run_command.assert_called_once_with("show version")
+    
+    def test_version_output_shared_across_getters(self, sample_version_output):
+        """Test that firmware reuses the cached show version output but uptime does not."""
+        conn = MockConnection()
+        conn.run_command = Mock(return_value=(True, sample_version_output))
+        
+        conn.get_model()
+        version = conn.get_firmware_version()
+        
+        assert version == "08.0.95hT213"
+        conn.run_command.assert_called_once_with("show version")
+        
+        # Uptime moves on during a long session, so it is read fresh each time
+        conn.run_command.return_value = (True, sample_version_output.replace("2 days", "5 days"))
+        uptime = conn.get_uptime()
+        
+        assert uptime == "5 days 3 hours 45 minutes"
+        assert conn.run_command.call_count == 2
+    
+    def test_invalidate_keeps_memoized_facts(self, sample_version_output):
+        """Test invalidate drops cached output but keeps model and serial."""
+        conn = MockConnection()
+        conn.run_command = Mock(return_value=(True, sample_version_output))
+        
+        conn.get_model()
+        conn.invalidate()
+        
+        assert conn._version_output is None
+        assert conn.get_model() == "ICX7250-48P"
+        conn.get_firmware_version()
+        assert conn.run_command.call_count == 2
+    
     def test_get_firmware_version_success(self, sample_version_output):
         """Test successful firmware version detection."""
         conn = MockConnection()
@@ -154,4 +201,37 @@ class TestDeviceInfo:
         
         uptime = conn.get_uptime()
         
-        assert uptime is None
\ No newline at end of file
+        assert uptime is None
+    
+    def test_prefetch_device_info_single_batch(self, sample_version_output):
+        """Test prefetched output feeds the getters without further commands."""
+        conn = MockConnection()
+        conn.run_readonly_commands = Mock(return_value=[
+            (True, sample_version_output),
+            (True, "Management MAC: 94B3.4F30.4788\n"),
+            (False, "Invalid input"),
+        ])
+        conn.run_command = Mock(return_value=(True, "hostname ICX7250-SW1\n"))
+        
+        conn.prefetch_device_info()
+        
+        assert conn.get_model() == "ICX7250-48P"
+        assert conn.get_serial() == "ABC123456789"
+        assert conn.get_chassis_mac() == "94b3.4f30.4788"
+        conn.run_command.assert_not_called()
+        
+        # Failed probes fall back to running the command
+        assert conn.get_hostname() == "ICX7250-SW1"
+        conn.run_command.assert_called_once_with("show running-config | include hostname")
+    
+    def test_get_hostname_ignores_command_echo(self):
+        """Test the echoed include filter is not mistaken for the hostname line."""
+        conn = MockConnection()
+        conn.hostname = None
+        conn._mock_output = (
+            "show running-config | include hostname\r\n"
+            "hostname ICX7250-SW1\r\n"
+            "SSH@ICX7250-SW1#"
+        )
+        
+        assert conn.get_hostname() == "ICX7250-SW1"
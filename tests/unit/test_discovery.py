@@ -0,0 +1,156 @@
+"""
+Unit tests for the SwitchDiscovery class.
+"""
+import pytest
+from unittest.mock import Mock, patch
+
+from ztp_agent.network.switch.discovery import SwitchDiscovery
+
+
+LLDP_DETAIL_OUTPUT = """\
+Local port: 1/1/1
+  Neighbor: 609c.9f1d.1a2b, TTL 112 seconds
+  + Chassis ID (MAC address): 609c.9f1d.1a2b
+  + Port ID (MAC address): 609c.9f1d.1a2c
+  + System name         : "ICX7150-C12P"
+  + Port description    : "GigabitEthernet1/1/10"
+  + Management address (IPv4): 192.168.1.2
+Local port: 1/1/5
+  Neighbor: 2c5d.3411.2233, TTL 120 seconds
+  + Chassis ID (MAC address): 2c5d.3411.2233
+  + Port ID (locally assigned): eth0
+  + System description  : "Ruckus R350 Multimedia Hotzone Wireless AP/SW Version: 7.1.0.510.1041"
+"""
+
+
+@pytest.fixture
+def discovery():
+    """SwitchDiscovery over a mock connection."""
+    connection = Mock()
+    connection.session_cache.return_value = {}
+    return SwitchDiscovery(connection)
+
+
+class TestSwitchDiscovery:
+    """Test cases for SwitchDiscovery class."""
+    
+    def test_get_lldp_neighbors_parses_detail(self, discovery):
+        """Test every LLDP field is collected under its local port."""
+        discovery.connection.run_readonly_command.return_value = (True, LLDP_DETAIL_OUTPUT)
+        
+        success, neighbors = discovery.get_lldp_neighbors()
+        
+        assert success is True
+        assert neighbors['1/1/1'] == {
+            'chassis_id': '609c.9f1d.1a2b',
+            'port_id': '609c.9f1d.1a2c',
+            'system_name': 'ICX7150-C12P',
+            'type': 'switch',
+            'port_description': 'GigabitEthernet1/1/10',
+            'mgmt_address': '192.168.1.2',
+        }
+        assert neighbors['1/1/5']['type'] == 'ap'
+        assert neighbors['1/1/5']['model'] == 'R350'
+        # The switch neighbor already reports an address, so trace-l2 is skipped
+        discovery.connection.run_readonly_command.assert_called_once_with("show lldp neighbors detail")
+    
+    @patch('ztp_agent.network.switch.discovery.time.sleep')
+    def test_get_lldp_neighbors_traces_unaddressed_switch(self, mock_sleep, discovery):
+        """Test trace-l2 fills in a switch address LLDP reported as 0.0.0.0."""
+        outputs = {
+            "show lldp neighbors detail": LLDP_DETAIL_OUTPUT.replace("192.168.1.2", "0.0.0.0"),
+            "trace-l2 vlan 1": "",
+            "trace-l2 show": "path 1 from 1/1/1,\n  1   1/1/1   IP  192.168.1.9  609c.9f1d.1a2b\n",
+        }
+        discovery.connection.run_command.side_effect = lambda command: (True, outputs[command])
+        discovery.connection.run_readonly_command.side_effect = lambda command: (True, outputs[command])
+        
+        success, neighbors = discovery.get_lldp_neighbors()
+        
+        assert neighbors['1/1/1']['mgmt_address'] == '192.168.1.9'
+        # Results are read as soon as the unaddressed switch has been traced
+        mock_sleep.assert_called_once_with(0.5)
+        
+        # trace-l2 itself runs on the shell; only its results are read over exec
+        discovery.connection.run_command.assert_called_once_with("trace-l2 vlan 1")
+        
+        # A second scan shortly after reuses the trace instead of probing again
+        discovery.connection.run_command.reset_mock()
+        discovery.connection.run_readonly_command.reset_mock()
+        success, neighbors = discovery.get_lldp_neighbors()
+        
+        assert neighbors['1/1/1']['mgmt_address'] == '192.168.1.9'
+        discovery.connection.run_readonly_command.assert_called_once_with("show lldp neighbors detail")
+        discovery.connection.run_command.assert_not_called()
+    
+    def test_trace_stops_once_results_settle(self, discovery):
+        """Test a switch trace-l2 never finds stops polling once the results stop changing."""
+        clock = [0.0]
+        outputs = {
+            "show lldp neighbors detail": LLDP_DETAIL_OUTPUT.replace("192.168.1.2", "0.0.0.0"),
+            "trace-l2 vlan 1": "",
+            "trace-l2 show": "path 1 from 1/1/2,\n  1   1/1/2   IP  192.168.1.7  609c.9f1d.7777\n",
+        }
+        discovery.connection.run_command.side_effect = lambda command: (True, outputs[command])
+        discovery.connection.run_readonly_command.side_effect = lambda command: (True, outputs[command])
+        
+        def fake_sleep(seconds):
+            clock[0] += seconds
+        
+        with patch('ztp_agent.network.switch.discovery.time.sleep', side_effect=fake_sleep), \
+             patch('ztp_agent.network.switch.discovery.time.monotonic', side_effect=lambda: clock[0]):
+            success, neighbors = discovery.get_lldp_neighbors()
+        
+        assert neighbors['1/1/1']['mgmt_address'] == '0.0.0.0'
+        # Stopped shortly after the minimum wait instead of polling for 11 seconds
+        assert clock[0] <= 2.5
+        
+        # The miss is cached, so a second scan does not probe again
+        discovery.connection.run_command.reset_mock()
+        with patch('ztp_agent.network.switch.discovery.time.monotonic', side_effect=lambda: clock[0]):
+            discovery.get_lldp_neighbors()
+        discovery.connection.run_command.assert_not_called()
+    
+    def test_get_lldp_neighbors_crlf_output(self, discovery):
+        """Test CRLF line endings from the switch do not leak into values."""
+        discovery.connection.run_readonly_command.return_value = (True, LLDP_DETAIL_OUTPUT.replace("\n", "\r\n"))
+        
+        success, neighbors = discovery.get_lldp_neighbors()
+        
+        assert neighbors['1/1/1']['system_name'] == 'ICX7150-C12P'
+        assert neighbors['1/1/1']['mgmt_address'] == '192.168.1.2'
+        assert neighbors['1/1/5']['port_id'] == 'eth0'
+    
+    def test_get_lldp_neighbors_type_independent_of_field_order(self, discovery):
+        """Test the system name decides the type even when it follows the description."""
+        discovery.connection.run_readonly_command.return_value = (True, (
+            "Local port: 1/1/2\n"
+            "  + System description  : \"RUCKUS AP firmware\"\n"
+            "  + System name         : \"ICX7150-C12P\"\n"
+            "  + Management address (IPv4): 192.168.1.5\n"
+        ))
+        
+        success, neighbors = discovery.get_lldp_neighbors()
+        
+        assert neighbors['1/1/2']['type'] == 'switch'
+        assert 'model' not in neighbors['1/1/2']
+    
+    def test_get_lldp_neighbors_command_failure(self, discovery):
+        """Test a failed command yields no neighbors."""
+        discovery.connection.run_readonly_command.return_value = (False, "Not connected")
+        
+        assert discovery.get_lldp_neighbors() == (False, {})
+    
+    def test_get_l2_trace_data_maps_mac_to_ip(self, discovery):
+        """Test trace-l2 hops are mapped by MAC, with or without the type column."""
+        discovery.connection.run_readonly_command.return_value = (True, (
+            "path 1 from 1/1/1,\n"
+            "  1   1/1/1   IP  192.168.1.3  609c.9f1d.1a2b\n"
+            "  2   1/1/2   IP  0.0.0.0      2c5d.3411.2233\n"
+            "  3   1/1/3   192.168.1.4  2c5d.3411.4455\n"
+        ))
+        
+        success, ip_data = discovery.get_l2_trace_data()
+        
+        assert success is True
+        assert ip_data == {'609c.9f1d.1a2b': '192.168.1.3', '2c5d.3411.4455': '192.168.1.4'}
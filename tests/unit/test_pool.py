@@ -0,0 +1,142 @@
+"""
+Unit tests for the SwitchConnectionPool class.
+"""
+import pytest
+from unittest.mock import Mock
+
+from ztp_agent.network.switch.pool import SwitchConnectionPool, connect_many
+
+
+def make_switch(ip='192.168.1.1', username='super', password='sp-admin', connects=True):
+    """Create a mock switch operation with a live transport."""
+    switch = Mock()
+    switch.ip = ip
+    switch.username = username
+    switch.password = password
+    switch.connected = False
+    switch.reset_session.return_value = True
+    
+    def connect():
+        switch.connected = connects
+        return connects
+    
+    switch.connect.side_effect = connect
+    switch.ssh_client.get_transport.return_value.is_active.return_value = True
+    return switch
+
+
+class TestSwitchConnectionPool:
+    """Test cases for SwitchConnectionPool class."""
+    
+    def test_borrow_reuses_session(self):
+        """Test a released session is handed out again without reconnecting."""
+        factory = Mock(side_effect=lambda ip, username, password, **kwargs: make_switch(ip, username, password))
+        pool = SwitchConnectionPool(factory=factory)
+        
+        with pool.borrow('192.168.1.1', 'super', 'sp-admin') as first:
+            pass
+        with pool.borrow('192.168.1.1', 'super', 'sp-admin') as second:
+            pass
+        
+        assert first is second
+        assert factory.call_count == 1
+        first.connect.assert_called_once()
+        first.ssh_client.get_transport.return_value.send_ignore.assert_called_once()
+    
+    def test_stale_session_is_replaced(self):
+        """Test a session whose transport died is dropped and replaced."""
+        factory = Mock(side_effect=lambda ip, username, password, **kwargs: make_switch(ip, username, password))
+        pool = SwitchConnectionPool(factory=factory)
+        
+        with pool.borrow('192.168.1.1', 'super', 'sp-admin') as first:
+            pass
+        first.ssh_client.get_transport.return_value.is_active.return_value = False
+        
+        with pool.borrow('192.168.1.1', 'super', 'sp-admin') as second:
+            pass
+        
+        assert second is not first
+        first.disconnect.assert_called_once()
+    
+    def test_release_resets_session(self):
+        """Test a session is reset before pooling and closed if the reset fails."""
+        switch = make_switch()
+        pool = SwitchConnectionPool(factory=Mock(return_value=switch))
+        
+        first = pool.acquire('192.168.1.1', 'super', 'sp-admin')
+        pool.release(first)
+        switch.reset_session.assert_called_once()
+        switch.disconnect.assert_not_called()
+        
+        switch.reset_session.return_value = False
+        pool.release(pool.acquire('192.168.1.1', 'super', 'sp-admin'))
+        switch.disconnect.assert_called_once()
+    
+    def test_acquire_finds_session_under_preferred_password(self):
+        """Test a session whose password changed on first login is reused."""
+        switch = make_switch(password='n3w-pass')
+        switch.connect()
+        factory = Mock()
+        pool = SwitchConnectionPool(factory=factory)
+        pool.release(switch)
+        
+        reused = pool.acquire('192.168.1.1', 'super', 'sp-admin', preferred_password='n3w-pass')
+        
+        assert reused is switch
+        factory.assert_not_called()
+    
+    def test_session_discarded_on_error(self):
+        """Test a session is closed rather than pooled when the block raises."""
+        switch = make_switch()
+        pool = SwitchConnectionPool(factory=Mock(return_value=switch))
+        
+        with pytest.raises(RuntimeError):
+            with pool.borrow('192.168.1.1', 'super', 'sp-admin'):
+                raise RuntimeError("boom")
+        
+        switch.disconnect.assert_called_once()
+        pool.close_all()
+        switch.disconnect.assert_called_once()
+    
+    def test_connect_failure(self):
+        """Test a failed connection is reported."""
+        pool = SwitchConnectionPool(factory=Mock(return_value=make_switch(connects=False)))
+        
+        with pytest.raises(ConnectionError):
+            with pool.borrow('192.168.1.1', 'super', 'sp-admin'):
+                pass
+    
+    def test_prewarm_connects_concurrently(self):
+        """Test prewarmed sessions are pooled and unreachable switches skipped."""
+        def factory(ip, username, password, **kwargs):
+            return make_switch(ip, username, password, connects=(ip != '192.168.1.9'))
+        
+        pool = SwitchConnectionPool(factory=Mock(side_effect=factory))
+        specs = [
+            {'ip': '192.168.1.1', 'username': 'super', 'password': 'sp-admin'},
+            {'ip': '192.168.1.9', 'username': 'super', 'password': 'sp-admin'},
+        ]
+        
+        assert pool.prewarm(specs) == 1
+        
+        with pool.borrow('192.168.1.1', 'super', 'sp-admin') as switch:
+            switch.connect.assert_called_once()
+    
+    def test_prewarm_skips_pooled_switches(self):
+        """Test a switch with an idle session is not connected again."""
+        factory = Mock(side_effect=lambda ip, username, password, **kwargs: make_switch(ip, username, password))
+        pool = SwitchConnectionPool(factory=factory)
+        specs = [{'ip': '192.168.1.1', 'username': 'super', 'password': 'sp-admin'}]
+        
+        assert pool.prewarm(specs) == 1
+        assert pool.prewarm(specs) == 0
+        assert factory.call_count == 1
+    
+    def test_connect_many_preserves_order(self):
+        """Test results line up with the input specs."""
+        specs = [{'ip': f'192.168.1.{i}', 'username': 'super', 'password': 'x'} for i in range(5)]
+        
+        switches = connect_many(specs, max_workers=3,
+                                factory=lambda ip, username, password: make_switch(ip, username, password))
+        
+        assert [switch.ip for switch in switches] == [spec['ip'] for spec in specs]
@@ -7,6 +7,7 @@ proper inheritance instead of monkey patching.
 
 # Re-export main classes
 from ztp_agent.network.switch.operation import SwitchOperation
+from ztp_agent.network.switch.pool import SwitchConnectionPool
 from ztp_agent.network.switch.enums import PortStatus, PoEStatus
 
 # Import configuration functions to attach as methods
@@ -60,4 +61,4 @@ SwitchOperation.set_poe_status = _create_config_method(set_poe_status)
 SwitchOperation.get_lldp_neighbors = _create_discovery_method(get_lldp_neighbors)
 SwitchOperation.get_l2_trace_data = _create_discovery_method(get_l2_trace_data)
 
-__all__ = ['SwitchOperation', 'PortStatus', 'PoEStatus']
\ No newline at end of file
+__all__ = ['SwitchOperation', 'SwitchConnectionPool', 'PortStatus', 'PoEStatus']
\ No newline at end of file
@@ -1,16 +1,133 @@
 """
 Base SSH connection handling for RUCKUS ICX switches.
 """
+import codecs
+import functools
 import logging
 import re
+import select
+import socket
 import time
-from typing import Optional, Tuple, Any, Callable
+from typing import Optional, Tuple, Any, Callable, Dict, List
 
 import paramiko
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# First-time login prompts asking for a new password and its confirmation
+_NEW_PASSWORD_RE = re.compile(r'Enter new password:|New password:|Enter the new password')
+_CONFIRM_PASSWORD_RE = re.compile(
+    r'Re-enter new password:|Confirm new password:|Re-enter the new password|'
+    r'Enter the reconfirm password|Please confirm'
+)
+_CONFIRM_PASSWORD_BYTES_RE = re.compile(_CONFIRM_PASSWORD_RE.pattern.encode())
+
+# Matches the end of the login banner: an exec/enable prompt, a login or
+# password prompt, or a first-login new password prompt such as
+# "Enter the new password for user super :". Only the very end of the
+# buffer counts, and a prompt character must follow a non-blank, so banner
+# art such as a line of "#" does not end the wait early.
+_PROMPT_OR_LOGIN_RE = re.compile(
+    rb'(?:[^\s>#][>#]|login:|[Pp]assword:|(?:' + _NEW_PASSWORD_RE.pattern.encode() + rb')[^\r\n]*)\s*\Z'
+)
+
+# Password prompt at the end of the raw receive buffer, including first-login
+# prompts such as "Enter the new password for user super :"
+_PASSWORD_PROMPT_BYTES_RE = re.compile(rb'[Pp]assword[^\r\n]*:\s*\Z')
+
+# Seconds of banner silence before a newline is sent to wake the switch; long
+# enough that a slow first-login password prompt is not answered with it
+_BANNER_NUDGE_AFTER = 3.0
+
+# User exec prompt, e.g. "ICX7250-48P>"
+_EXEC_PROMPT_RE = re.compile(r'>\s*$', re.MULTILINE)
+
+# Prompts are short, so prompt detection only looks at this many trailing characters
+_PROMPT_TAIL = 64
+
+# Characters a CLI prompt ends with, e.g. "ICX7250-48P>" or "ICX7250-48P(config)#"
+_PROMPT_END_BYTES = (b'>', b'#')
+
+# User exec prompt at the end of the raw receive buffer
+_EXEC_PROMPT_BYTES_RE = re.compile(rb'>\s*$')
+
+# Any CLI prompt at the end of the raw receive buffer
+_CLI_PROMPT_BYTES_RE = re.compile(rb'[>#]\s*$')
+
+# Ctrl-C aborts a stuck command or --More-- pager; the newline then asks for
+# a fresh prompt, which is awaited for at most _RECOVER_TIMEOUT seconds
+_INTERRUPT = b"\x03\n"
+_RECOVER_TIMEOUT = 1.0
+
+# How far back before newly received data a pattern search restarts, so
+# matches spanning two reads are still found without rescanning the buffer
+_SEARCH_OVERLAP = 128
+
+# Largest read taken from the shell at once; large enough that a burst such
+# as show lldp neighbors detail is drained in one call per select wakeup
+_RECV_SIZE = 65536
+
+# Seconds a batch may rest at a prompt with echoes still unmatched before it
+# is treated as complete, instead of waiting out the whole timeout
+_BATCH_QUIET = 1.0
+
+# Errors from the SSH connect itself meaning the switch cannot be reached at
+# all, so trying another password would only wait out a second TCP connect
+_UNREACHABLE_ERRORS = (socket.timeout, ConnectionRefusedError, paramiko.ssh_exception.NoValidConnectionsError)
+
+# Seconds between SSH keepalives, so NAT and firewalls keep idle sessions open
+_KEEPALIVE_INTERVAL = 30
+
+# Line terminator for commands, pre-encoded so sends skip string formatting
+_NEWLINE = b"\n"
+
+# Enter enable mode, disable paging and drop back to user mode in one write
+_DISABLE_PAGING_BLOCK = b"enable\nskip-page-display\nexit\n"
+
+
+@functools.lru_cache(maxsize=256)
+def _echo_re(command: str) -> "re.Pattern[str]":
+    """Return a cached pattern matching the shell's echo of a command line."""
+    return re.compile(re.escape(command) + r'\r?\n')
+
+
+@functools.lru_cache(maxsize=256)
+def _echo_bytes_re(command: str) -> "re.Pattern[bytes]":
+    """Return a cached pattern matching the raw echo of a command line."""
+    return re.compile(re.escape(command.encode()) + rb'\r?\n')
+
+
+# Messages the ICX CLI prints when it rejects a command, scanned in one pass
+_CLI_ERROR_RE = re.compile(r'Invalid input|Command not found|Incomplete command|Error - ')
+
+
+def _ends_with_prompt(data: bytes) -> bool:
+    """Return True if raw received output ends in a CLI prompt."""
+    return data[-_PROMPT_TAIL:].rstrip().endswith(_PROMPT_END_BYTES)
+
+
+def _has_cli_error(output: str) -> bool:
+    """Return True if the CLI rejected a command in this output."""
+    return _CLI_ERROR_RE.search(output) is not None
+
+
+class _AcceptHostKeyPolicy(paramiko.MissingHostKeyPolicy):
+    """
+    Accept unknown host keys without recording them.
+    
+    ZTP talks to factory-fresh switches whose keys cannot be known in
+    advance, so there is nothing to verify or remember.
+    """
+    
+    def missing_host_key(self, client, hostname, key):
+        pass
+
+
+def _noop_debug(message: str, color: str = None) -> None:
+    """Debug callback used when debug output is disabled."""
+
+
 class BaseConnection:
     """Base class for SSH connections to RUCKUS ICX switches."""
     
@@ -38,11 +155,29 @@ class BaseConnection:
         self.debug = debug
         self.debug_callback = debug_callback
         
+        # Debug sink bound once, so disabled debug output costs a single no-op call
+        self._dbg = debug_callback if (debug and debug_callback) else _noop_debug
+        
         # Connection state
         self.ssh_client: Optional[paramiko.SSHClient] = None
         self.shell: Optional[paramiko.Channel] = None
         self.connected = False
         
+        # Streaming decoder so multi-byte characters split across reads survive
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        
+        # Last CLI prompt seen, so mode changes already in effect can be skipped
+        self._last_prompt = ""
+        
+        # When set, exit_config_mode(save=True) only marks the configuration
+        # dirty and flush_config commits every pending change with a single
+        # write memory, instead of one flash write per configuration step
+        self.defer_saves = False
+        self._config_dirty = False
+        
+        # Results helpers such as SwitchDiscovery keep for this session only
+        self._session_cache: Dict[str, Any] = {}
+        
         # Device info (will be populated)
         self.hostname: Optional[str] = None
         self.model: Optional[str] = None
@@ -57,11 +192,13 @@ class BaseConnection:
         """
         if self.connected:
             return True
+        
+        self._decoder.reset()
             
         try:
             # Create SSH client
             self.ssh_client = paramiko.SSHClient()
-            self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            self.ssh_client.set_missing_host_key_policy(_AcceptHostKeyPolicy())
             
             # Try connection with current password
             if self._try_connect_with_password(self.password):
@@ -69,11 +206,19 @@ class BaseConnection:
                 
             # If that fails, try with preferred password (might already be set)
             if self.preferred_password != self.password:
+                # Close the failed attempt's transport before opening another
+                self._close_session()
                 if self._try_connect_with_password(self.preferred_password):
                     self.password = self.preferred_password  # Update current password
                     return True
             
             logger.error(f"Failed to connect to switch {self.ip}")
+            self._close_session()
+            return False
+            
+        except _UNREACHABLE_ERRORS as e:
+            logger.error(f"Could not reach switch {self.ip}: {e}")
+            self.disconnect()
             return False
             
         except Exception as e:
@@ -102,27 +247,35 @@ class BaseConnection:
                 look_for_keys=False
             )
             
+        except _UNREACHABLE_ERRORS:
+            # Network failure rather than a rejected password; let connect() stop
+            raise
+            
+        except Exception as e:
+            logger.debug(f"Connection attempt failed for {self.ip} with password: {e}")
+            return False
+        
+        try:
+            # Keep the session alive while it sits idle (e.g. in a connection pool)
+            transport = self.ssh_client.get_transport()
+            if transport is not None:
+                transport.set_keepalive(_KEEPALIVE_INTERVAL)
+                self._tune_socket(transport.sock)
+            
             # Open shell
             self.shell = self.ssh_client.invoke_shell()
             self.shell.settimeout(self.timeout)
             
-            # Wait for initial prompt and handle first-time login
-            time.sleep(2)  # Give time for initial output
-            initial_output = ""
-            
-            # Read initial output
-            while self.shell.recv_ready():
-                chunk = self.shell.recv(4096).decode('utf-8', errors='ignore')
-                initial_output += chunk
-                time.sleep(0.1)
+            # Wait for initial prompt and handle first-time login. Return as soon
+            # as the banner ends in a prompt instead of sleeping a fixed interval.
+            initial_output = self._wait_for_pattern(_PROMPT_OR_LOGIN_RE, timeout=15,
+                                                    nudge_after=_BANNER_NUDGE_AFTER)
             
-            if self.debug and self.debug_callback:
-                self.debug_callback(f"Initial output: {initial_output}", "cyan")
+            if self._dbg is not _noop_debug:
+                self._dbg(f"Initial output: {initial_output}", "cyan")
             
             # Handle first-time login if needed
-            if ("Enter new password:" in initial_output or 
-                "New password:" in initial_output or
-                "Enter the new password" in initial_output):
+            if _NEW_PASSWORD_RE.search(initial_output):
                 logger.info(f"First-time login detected for {self.ip}, changing password from default to preferred")
                 updated_output = self._handle_first_time_login(initial_output)
                 if updated_output is False:
@@ -133,11 +286,12 @@ class BaseConnection:
                     initial_output = updated_output  # Use updated output for prompt check
             
             # Check if we're in exec mode (prompt ends with '>')
-            is_exec_prompt = re.search(r'>\s*$', initial_output, re.MULTILINE)
+            is_exec_prompt = _EXEC_PROMPT_RE.search(initial_output)
             
             if not is_exec_prompt:
                 logger.error(f"Did not receive expected prompt from switch {self.ip}")
                 return False
+            self._remember_prompt(initial_output)
             
             # Disable pagination for clean programmatic parsing
             self._disable_pagination()
@@ -152,9 +306,99 @@ class BaseConnection:
             return True
             
         except Exception as e:
-            logger.debug(f"Connection attempt failed for {self.ip} with password: {e}")
+            logger.debug(f"Session setup failed for {self.ip}: {e}")
             return False
     
+    def _tune_socket(self, sock: Any) -> None:
+        """
+        Disable Nagle's algorithm on the SSH socket.
+        
+        CLI traffic is many small command writes each waiting for a reply,
+        which Nagle plus delayed ACKs would otherwise hold back.
+        
+        Args:
+            sock: Socket underlying the SSH transport.
+        """
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        except (AttributeError, OSError) as e:
+            # Not a plain TCP socket (e.g. a proxy command channel)
+            logger.debug(f"Could not set socket options for switch {self.ip}: {e}")
+    
+    def _wait_for_pattern(self, pattern: "re.Pattern[bytes]", timeout: float = 10.0,
+                          nudge_after: Optional[float] = None) -> str:
+        """
+        Read from the shell until the buffer matches a pattern or the timeout expires.
+        
+        Output is accumulated as bytes and decoded once on return; each read
+        only rescans the newly received data plus a small overlap.
+        
+        Args:
+            pattern: Compiled bytes pattern searched against the accumulated output.
+            timeout: Maximum time to wait in seconds.
+            nudge_after: If the shell has been quiet for this many seconds, send
+                a single newline to wake up slow-to-greet switches. Never sent
+                while the output ends in a password prompt, where the newline
+                would be taken as an empty password.
+            
+        Returns:
+            Output received so far (may be incomplete on timeout).
+        """
+        buffer = bytearray()
+        start = time.monotonic()
+        deadline = start + timeout
+        last_data = start
+        nudged = nudge_after is None
+        
+        while True:
+            now = time.monotonic()
+            remaining = deadline - now
+            if remaining <= 0:
+                break
+            
+            wait = remaining
+            nudge_due = False
+            if not nudged and last_data + nudge_after - now < remaining:
+                wait = max(0.0, last_data + nudge_after - now)
+                nudge_due = True
+            
+            ready, _, _ = select.select([self.shell], [], [], wait)
+            if not ready:
+                if nudge_due:
+                    nudged = True
+                    if not _PASSWORD_PROMPT_BYTES_RE.search(buffer[-_PROMPT_TAIL:]):
+                        self.shell.send(_NEWLINE)
+                continue
+            
+            data = self.shell.recv(_RECV_SIZE)
+            if not data:
+                # Channel closed by the switch
+                break
+            scan_from = max(0, len(buffer) - _SEARCH_OVERLAP)
+            buffer.extend(data)
+            last_data = time.monotonic()
+            
+            if pattern.search(buffer, scan_from):
+                break
+        
+        return buffer.decode('utf-8', errors='ignore')
+    
+    def _send_and_wait(self, text: bytes, pattern: "re.Pattern[bytes]", timeout: float = 10.0) -> str:
+        """
+        Send text to the shell and read until the reply matches a pattern.
+        
+        Args:
+            text: Encoded text to send, including any trailing newlines.
+            pattern: Compiled bytes pattern marking the end of the reply.
+            timeout: Maximum time to wait in seconds.
+            
+        Returns:
+            Output received so far (may be incomplete on timeout).
+        """
+        self.shell.send(text)
+        return self._wait_for_pattern(pattern, timeout=timeout)
+    
     def _handle_first_time_login(self, initial_output: str) -> bool:
         """
         Handle first-time login password change.
@@ -166,49 +410,28 @@ class BaseConnection:
             True if successful, False otherwise.
         """
         try:
-            if self.debug and self.debug_callback:
-                self.debug_callback("Handling first-time login password change", "yellow")
-            
-            # Send new password
-            self.shell.send(f"{self.preferred_password}\n")
-            time.sleep(1)
-            
-            # Read confirmation prompt
-            output = ""
-            for _ in range(10):  # Wait up to 10 seconds
-                if self.shell.recv_ready():
-                    chunk = self.shell.recv(4096).decode('utf-8', errors='ignore')
-                    output += chunk
-                    
-                    if ("Re-enter new password:" in output or 
-                        "Confirm new password:" in output or
-                        "Re-enter the new password" in output or
-                        "Enter the reconfirm password" in output or
-                        "Please confirm" in output):
-                        break
-                time.sleep(1)
-            else:
+            self._dbg("Handling first-time login password change", "yellow")
+            
+            # The new password is sent twice; encode the line once
+            password_line = self.preferred_password.encode() + _NEWLINE
+            
+            # Send new password and wait for the confirmation prompt
+            output = self._send_and_wait(password_line, _CONFIRM_PASSWORD_BYTES_RE, timeout=11)
+            
+            if not _CONFIRM_PASSWORD_RE.search(output):
                 logger.error(f"Did not receive password confirmation prompt. Got: {output}")
                 return False
             
-            # Confirm new password
-            self.shell.send(f"{self.preferred_password}\n")
-            time.sleep(2)
-            
-            # Read final output and check for success
-            final_output = ""
-            for _ in range(10):
-                if self.shell.recv_ready():
-                    chunk = self.shell.recv(4096).decode('utf-8', errors='ignore')
-                    final_output += chunk
-                time.sleep(1)
+            # Confirm new password and wait for the exec prompt rather than
+            # always sleeping out the full window
+            final_output = self._send_and_wait(password_line, _EXEC_PROMPT_BYTES_RE, timeout=12)
             
-            if self.debug and self.debug_callback:
-                self.debug_callback(f"First-time login result: {final_output}", "cyan")
+            if self._dbg is not _noop_debug:
+                self._dbg(f"First-time login result: {final_output}", "cyan")
             
             # Check if we have a valid prompt after password change
             # Look for prompt anywhere in the output, not just at the end
-            if re.search(r'>\s*$', final_output, re.MULTILINE) or ">" in final_output:
+            if _EXEC_PROMPT_RE.search(final_output) or ">" in final_output:
                 # Update current password and combine outputs for final prompt check
                 self.password = self.preferred_password
                 combined_output = initial_output + final_output  # Combine for final check
@@ -228,47 +451,15 @@ class BaseConnection:
         Uses 'skip-page-display' command in enable mode.
         """
         try:
-            if self.debug and self.debug_callback:
-                self.debug_callback("Disabling pagination with skip-page-display", "yellow")
-            
-            # Enter enable mode (no password required as mentioned)
-            self.shell.send("enable\n")
-            time.sleep(1)
-            
-            # Read enable mode response
-            enable_output = ""
-            while self.shell.recv_ready():
-                chunk = self.shell.recv(4096).decode('utf-8', errors='ignore')
-                enable_output += chunk
-                time.sleep(0.1)
-            
-            if self.debug and self.debug_callback:
-                self.debug_callback(f"Enable mode output: {enable_output}", "cyan")
-            
-            # Send skip-page-display command
-            self.shell.send("skip-page-display\n")
-            time.sleep(1)
-            
-            # Read skip-page-display response
-            skip_output = ""
-            while self.shell.recv_ready():
-                chunk = self.shell.recv(4096).decode('utf-8', errors='ignore')
-                skip_output += chunk
-                time.sleep(0.1)
-            
-            if self.debug and self.debug_callback:
-                self.debug_callback(f"Skip-page-display output: {skip_output}", "cyan")
-            
-            # Exit back to user mode
-            self.shell.send("exit\n")
-            time.sleep(1)
-            
-            # Read exit response
-            exit_output = ""
-            while self.shell.recv_ready():
-                chunk = self.shell.recv(4096).decode('utf-8', errors='ignore')
-                exit_output += chunk
-                time.sleep(0.1)
+            self._dbg("Disabling pagination with skip-page-display", "yellow")
+            
+            # Enter enable mode (no password required as mentioned), disable
+            # paging and drop back to user mode in a single write, then wait
+            # once for the user exec prompt that follows the final exit
+            skip_output = self._send_and_wait(_DISABLE_PAGING_BLOCK, _EXEC_PROMPT_BYTES_RE, timeout=10)
+            
+            if self._dbg is not _noop_debug:
+                self._dbg(f"Skip-page-display output: {skip_output}", "cyan")
             
             if "Disable page display mode" in skip_output:
                 logger.info(f"Successfully disabled pagination on switch {self.ip}")
@@ -279,9 +470,21 @@ class BaseConnection:
             logger.warning(f"Failed to disable pagination on switch {self.ip}: {e}")
             # Don't fail the connection for this
     
+    def _close_session(self) -> None:
+        """Close the shell and SSH transport, keeping the client for reuse."""
+        if self.shell:
+            self.shell.close()
+            self.shell = None
+        if self.ssh_client:
+            self.ssh_client.close()
+    
     def disconnect(self) -> None:
         """Disconnect from the switch."""
         try:
+            # Never drop changes whose save was deferred
+            if self._config_dirty and self.connected:
+                self.flush_config()
+            
             if self.shell:
                 self.shell.close()
                 self.shell = None
@@ -291,6 +494,9 @@ class BaseConnection:
                 self.ssh_client = None
                 
             self.connected = False
+            self._decoder.reset()
+            self._last_prompt = ""
+            self._session_cache.clear()
             logger.debug(f"Disconnected from switch {self.ip}")
             
             # Update inventory if callback is available
@@ -300,13 +506,48 @@ class BaseConnection:
         except Exception as e:
             logger.error(f"Error disconnecting from switch {self.ip}: {e}")
     
+    def session_cache(self) -> Dict[str, Any]:
+        """
+        Get the cache for results that only hold while this session is open.
+        
+        Callers keep entries under their own key; everything is dropped on
+        disconnect, so a new session starts fresh.
+        
+        Returns:
+            Mutable dictionary owned by the connection.
+        """
+        return self._session_cache
+    
+    def _remember_prompt(self, output: str) -> None:
+        """
+        Record the CLI prompt at the end of command output, if there is one.
+        
+        Args:
+            output: Output read from the shell.
+        """
+        tail = output[-_PROMPT_TAIL:].rstrip()
+        if tail.endswith(('>', '#')):
+            self._last_prompt = tail.rsplit('\n', 1)[-1].strip()
+    
+    def _recover_prompt(self) -> None:
+        """
+        Get the shell back to a prompt after a command timed out.
+        
+        Without this, a command stuck in a pager or still running leaves its
+        output in front of every later command, so each of them times out too.
+        """
+        self._dbg("No prompt received, interrupting", "yellow")
+        output = self._send_and_wait(_INTERRUPT, _CLI_PROMPT_BYTES_RE, timeout=_RECOVER_TIMEOUT)
+        self._remember_prompt(output)
+    
     def run_command(self, command: str, wait_time: float = 2.0) -> Tuple[bool, str]:
         """
         Execute a command on the switch.
         
         Args:
             command: Command to execute.
-            wait_time: Time to wait for output.
+            wait_time: Unused; output is read until the prompt returns.
+                Kept for compatibility with existing callers.
             
         Returns:
             Tuple of (success, output).
@@ -317,36 +558,50 @@ class BaseConnection:
         
         try:
             # Send command
-            self.shell.send(f"{command}\n")
-            
-            if self.debug and self.debug_callback:
-                self.debug_callback(f"Command: {command}", "yellow")
-            
-            # Wait for output
-            time.sleep(wait_time)
-            
-            # Read output
-            output = ""
-            start_time = time.time()
+            self.shell.send(command.encode() + _NEWLINE)
+            
+            self._dbg(f"Command: {command}", "yellow")
+            
+            # Read output as soon as it arrives, with no fixed settle delay;
+            # collect raw chunks and decode once at the end
+            chunks: List[bytes] = []
+            tail = b""
+            deadline = time.monotonic() + self.timeout
+            
+            while True:
+                # Block until data arrives instead of polling on a fixed interval;
+                # the wait is derived from a single monotonic deadline
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"Command '{command}' timed out on switch {self.ip}")
+                    self._recover_prompt()
+                    break
+                
+                ready, _, _ = select.select([self.shell], [], [], min(remaining, 0.5))
+                if not ready:
+                    continue
+                
+                data = self.shell.recv(_RECV_SIZE)
+                if not data:
+                    # Channel closed by the switch
+                    break
+                chunks.append(data)
+                
+                # Check if we have a complete response (ends with prompt); the
+                # tail carries the end of earlier reads, so a prompt split
+                # across two reads is still seen
+                tail = tail[-_PROMPT_TAIL:] + data
+                if _ends_with_prompt(tail):
+                    break
             
-            while time.time() - start_time < self.timeout:
-                if self.shell.recv_ready():
-                    chunk = self.shell.recv(4096).decode('utf-8', errors='ignore')
-                    output += chunk
-                    
-                    # Check if we have a complete response (ends with prompt)
-                    if re.search(r'[>#]\s*$', output, re.MULTILINE):
-                        break
-                        
-                time.sleep(0.1)
-            else:
-                logger.warning(f"Command '{command}' timed out on switch {self.ip}")
+            output = self._decoder.decode(b"".join(chunks))
+            self._remember_prompt(output)
             
-            if self.debug and self.debug_callback:
-                self.debug_callback(f"Output: {output}", "cyan")
+            if self._dbg is not _noop_debug:
+                self._dbg(f"Output: {output}", "cyan")
             
             # Check for common error patterns
-            if "Invalid input" in output or "Command not found" in output:
+            if _has_cli_error(output):
                 logger.error(f"Command '{command}' failed on switch {self.ip}: {output}")
                 return False, output
             
@@ -356,6 +611,238 @@ class BaseConnection:
             logger.error(f"Error executing command '{command}' on switch {self.ip}: {e}", exc_info=True)
             return False, f"Error: {e}"
     
+    def run_exec_command(self, command: str, timeout: Optional[float] = None) -> Tuple[bool, str]:
+        """
+        Execute a stateless command on its own exec channel.
+        
+        Opens a session on the already authenticated transport, so no new
+        handshake is needed, and reads until the switch closes the channel.
+        There is no prompt scraping or settle delay. The command runs outside
+        the interactive shell, so it cannot rely on enable or config mode;
+        use run_command for anything stateful.
+        
+        Args:
+            command: Command to execute.
+            timeout: Time to wait for the command (defaults to self.timeout).
+            
+        Returns:
+            Tuple of (success, output).
+        """
+        return self.run_exec_commands([command], timeout)[0]
+    
+    def run_exec_commands(self, commands: List[str], timeout: Optional[float] = None) -> List[Tuple[bool, str]]:
+        """
+        Execute independent stateless commands concurrently on one transport.
+        
+        Every command gets its own exec channel multiplexed over the existing
+        SSH connection, so the switch runs them side by side and the batch
+        takes about as long as the slowest command.
+        
+        Args:
+            commands: Commands to execute.
+            timeout: Time to wait for each command (defaults to self.timeout).
+            
+        Returns:
+            List of (success, output) tuples, one per command.
+        """
+        transport = self.ssh_client.get_transport() if self.ssh_client else None
+        if not self.connected or transport is None or not transport.is_active():
+            logger.error(f"Not connected to switch {self.ip}")
+            return [(False, "Not connected") for _ in commands]
+        
+        wait = timeout or self.timeout
+        channels = []
+        try:
+            # Start every command before reading any output
+            for command in commands:
+                channel = transport.open_session(timeout=wait)
+                channels.append(channel)
+                channel.settimeout(wait)
+                channel.exec_command(command)
+            
+            self._dbg(f"Exec commands: {commands}", "yellow")
+            
+            return [self._read_exec_channel(command, channel)
+                    for command, channel in zip(commands, channels)]
+            
+        except Exception as e:
+            logger.error(f"Error executing commands {commands} on switch {self.ip}: {e}", exc_info=True)
+            return [(False, f"Error: {e}") for _ in commands]
+        finally:
+            for channel in channels:
+                channel.close()
+    
+    def _read_exec_channel(self, command: str, channel: paramiko.Channel) -> Tuple[bool, str]:
+        """
+        Read an exec channel to EOF and check the command result.
+        
+        Args:
+            command: Command running on the channel.
+            channel: Exec channel to read.
+            
+        Returns:
+            Tuple of (success, output).
+        """
+        try:
+            output = channel.makefile('rb', -1).read().decode('utf-8', errors='ignore')
+            exit_status = channel.recv_exit_status()
+        except Exception as e:
+            logger.error(f"Error executing command '{command}' on switch {self.ip}: {e}", exc_info=True)
+            return False, f"Error: {e}"
+        
+        if self._dbg is not _noop_debug:
+            self._dbg(f"Output: {output}", "cyan")
+        
+        if exit_status not in (0, -1) or _has_cli_error(output):
+            logger.error(f"Command '{command}' failed on switch {self.ip}: {output}")
+            return False, output
+        
+        return True, output
+    
+    def run_readonly_command(self, command: str) -> Tuple[bool, str]:
+        """
+        Execute a read-only command on an exec channel, falling back to the shell.
+        
+        Args:
+            command: Command to execute.
+            
+        Returns:
+            Tuple of (success, output).
+        """
+        return self.run_readonly_commands([command])[0]
+    
+    def run_readonly_commands(self, commands: List[str]) -> List[Tuple[bool, str]]:
+        """
+        Execute read-only commands concurrently, falling back to the shell.
+        
+        Every command first runs on its own exec channel. Commands whose exec
+        request failed, as on firmware that refuses exec sessions, are
+        retried together in one batch on the interactive shell.
+        
+        Args:
+            commands: Commands to execute.
+            
+        Returns:
+            List of (success, output) tuples, one per command.
+        """
+        results = self.run_exec_commands(commands)
+        
+        retry = [i for i, (success, _) in enumerate(results) if not success]
+        if retry:
+            logger.debug(f"Exec channel failed for {[commands[i] for i in retry]} on switch {self.ip}, "
+                         f"using the shell")
+            for i, result in zip(retry, self.run_commands([commands[i] for i in retry])):
+                results[i] = result
+        
+        return results
+    
+    def run_commands(self, commands: List[str], timeout: Optional[float] = None) -> List[Tuple[bool, str]]:
+        """
+        Execute several commands in a single shell write.
+        
+        All commands are sent at once and the output is read until the echo
+        of the last command is followed by a prompt, so the batch costs one
+        round-trip instead of one per command. Output is split back per
+        command on each command's echo.
+        
+        Args:
+            commands: Non-empty commands to execute, in order.
+            timeout: Time to wait for the whole batch (defaults to self.timeout).
+            
+        Returns:
+            List of (success, output) tuples, one per command.
+        """
+        if not self.connected or not self.shell:
+            logger.error(f"Not connected to switch {self.ip}")
+            return [(False, "Not connected") for _ in commands]
+        
+        if not commands:
+            return []
+        
+        try:
+            self.shell.send("\n".join(commands).encode() + _NEWLINE)
+            
+            self._dbg(f"Commands: {commands}", "yellow")
+            
+            # Read until every command has been echoed and a prompt follows the
+            # last echo; work on raw bytes and decode once at the end
+            buffer = bytearray()
+            echoes = [_echo_bytes_re(command) for command in commands]
+            echoed = 0
+            echo_end = 0
+            last_data = time.monotonic()
+            deadline = last_data + (timeout or self.timeout)
+            
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"Commands {commands} timed out on switch {self.ip}")
+                    self._recover_prompt()
+                    break
+                
+                ready, _, _ = select.select([self.shell], [], [], min(remaining, 0.5))
+                if not ready:
+                    # An echo the switch wrapped or garbled never matches; once
+                    # the output rests at a prompt and goes quiet, the batch is done
+                    if _ends_with_prompt(buffer) and time.monotonic() - last_data >= _BATCH_QUIET:
+                        logger.debug(f"Matched {echoed} of {len(echoes)} echoes on switch {self.ip}, "
+                                     f"ending batch at a quiet prompt")
+                        break
+                    continue
+                
+                data = self.shell.recv(_RECV_SIZE)
+                if not data:
+                    # Channel closed by the switch
+                    break
+                buffer.extend(data)
+                last_data = time.monotonic()
+                
+                # Match echoes in order, so a command repeated in the batch
+                # (such as exit) only counts as the last one once every
+                # earlier echo has been seen
+                while echoed < len(echoes):
+                    match = echoes[echoed].search(buffer, echo_end)
+                    if not match:
+                        break
+                    echo_end = match.end()
+                    echoed += 1
+                
+                if echoed == len(echoes) and len(buffer) > echo_end and _ends_with_prompt(buffer):
+                    break
+            
+            output = self._decoder.decode(bytes(buffer))
+            self._remember_prompt(output)
+            
+            if self._dbg is not _noop_debug:
+                self._dbg(f"Output: {output}", "cyan")
+            
+            # Split the combined output on each command's echo
+            starts = []
+            pos = 0
+            for command in commands:
+                match = _echo_re(command).search(output, pos)
+                if match:
+                    starts.append(match.start())
+                    pos = match.end()
+                else:
+                    starts.append(pos)
+            
+            results = []
+            for i, command in enumerate(commands):
+                end = starts[i + 1] if i + 1 < len(commands) else len(output)
+                segment = output[starts[i]:end]
+                if _has_cli_error(segment):
+                    logger.error(f"Command '{command}' failed on switch {self.ip}: {segment}")
+                    results.append((False, segment))
+                else:
+                    results.append((True, segment))
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error executing commands {commands} on switch {self.ip}: {e}", exc_info=True)
+            return [(False, f"Error: {e}") for _ in commands]
+    
     def enter_config_mode(self) -> bool:
         """
         Enter configuration mode.
@@ -364,21 +851,29 @@ class BaseConnection:
         Returns:
             True if successful, False otherwise.
         """
-        # First enter enable mode
-        success, output = self.run_command("enable")
-        if not success:
-            logger.error(f"Failed to enter enable mode on switch {self.ip}: {output}")
-            return False
-        
-        if self.debug and self.debug_callback:
-            self.debug_callback("Entered enable mode", "green")
+        prompt = self._last_prompt
+        if prompt.endswith("(config)#"):
+            self._dbg("Already in configuration mode", "green")
+            return True
         
-        # Now enter configuration mode
-        success, output = self.run_command("configure terminal")
+        if prompt.endswith("#") and "(config" not in prompt:
+            # Already in enable mode
+            success, output = self.run_command("configure terminal")
+        else:
+            # Enter enable mode and then configuration mode in one round-trip
+            (success, output), (config_success, config_output) = self.run_commands(
+                ["enable", "configure terminal"]
+            )
+            if not success:
+                logger.error(f"Failed to enter enable mode on switch {self.ip}: {output}")
+                return False
+            
+            self._dbg("Entered enable mode", "green")
+            
+            success, output = config_success, config_output
         
         if success and "(config)" in output:
-            if self.debug and self.debug_callback:
-                self.debug_callback("Entered configuration mode", "green")
+            self._dbg("Entered configuration mode", "green")
             return True
         else:
             logger.error(f"Failed to enter config mode on switch {self.ip}: {output}")
@@ -395,12 +890,23 @@ class BaseConnection:
             True if successful, False otherwise.
         """
         try:
-            # Exit config mode (to enable mode)
-            success, output = self.run_command("exit")
-            
-            if not success:
-                logger.error(f"Failed to exit config mode on switch {self.ip}: {output}")
-                return False
+            if save and self.defer_saves:
+                # Leave the flash write to flush_config
+                self._config_dirty = True
+                save = False
+            
+            prompt = self._last_prompt
+            if prompt.endswith("#") and "(config" not in prompt:
+                # Already back in enable mode; another exit would drop to user mode
+                self._dbg("Already out of configuration mode", "green")
+            else:
+                # Exit config mode (to enable mode); from a nested level such as
+                # interface config, "end" returns to enable mode in one step
+                success, output = self.run_command("end" if "(config-" in prompt else "exit")
+                
+                if not success:
+                    logger.error(f"Failed to exit config mode on switch {self.ip}: {output}")
+                    return False
             
             # Save configuration if requested (in enable mode)
             if save:
@@ -409,8 +915,7 @@ class BaseConnection:
                     logger.error(f"Failed to save configuration on switch {self.ip}: {output}")
                     return False
                     
-                if self.debug and self.debug_callback:
-                    self.debug_callback("Configuration saved", "green")
+                self._dbg("Configuration saved", "green")
             
             # Exit enable mode back to user mode
             success, output = self.run_command("exit")
@@ -424,6 +929,55 @@ class BaseConnection:
             logger.error(f"Error exiting config mode on switch {self.ip}: {e}", exc_info=True)
             return False
     
+    def flush_config(self) -> bool:
+        """
+        Save configuration whose save was deferred by defer_saves.
+        
+        All pending changes are committed with one write memory, run from
+        enable mode in a single round-trip.
+        
+        Returns:
+            True if nothing was pending or the save succeeded, False otherwise.
+        """
+        if not self._config_dirty:
+            return True
+        
+        if self._last_prompt.endswith("#"):
+            commands = ["write memory"]
+        else:
+            commands = ["enable", "write memory", "exit"]
+        
+        if not all(success for success, _ in self.run_commands(commands)):
+            logger.error(f"Failed to save deferred configuration on switch {self.ip}")
+            return False
+        
+        self._config_dirty = False
+        self._dbg("Configuration saved", "green")
+        return True
+    
+    def reset_session(self) -> bool:
+        """
+        Save deferred changes and return the shell to user exec mode.
+        
+        Leaves the session as a fresh connect would, so it can be reused
+        for unrelated work.
+        
+        Returns:
+            True if the session is clean, False otherwise.
+        """
+        if not self.flush_config():
+            return False
+        self.defer_saves = False
+        
+        if "(config" in self._last_prompt:
+            commands = ["end", "exit"]
+        elif self._last_prompt.endswith("#"):
+            commands = ["exit"]
+        else:
+            return True
+        
+        return all(success for success, _ in self.run_commands(commands))
+    
     def __enter__(self):
         """Context manager entry."""
         if self.connect():
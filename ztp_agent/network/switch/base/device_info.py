@@ -3,54 +3,196 @@ Device information retrieval for RUCKUS ICX switches.
 """
 import logging
 import re
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Model patterns, tried in order against show version output
+# Examples: "RUCKUS ICX7250-48P Router", "HW: Stackable ICX8200-C08PF-POE"
+_MODEL_PATTERNS = (
+    re.compile(r'RUCKUS\s+(ICX\S+)', re.IGNORECASE),
+    re.compile(r'HW:\s+Stackable\s+(ICX\S+)', re.IGNORECASE),
+    re.compile(r'System\s+Type:\s*(\S+)', re.IGNORECASE),
+)
+
+# Serial patterns, tried in order against show version output
+# Examples: "Serial Number: ABC123456789", "Serial #: FNS4352T0D4"
+_SERIAL_PATTERNS = (
+    re.compile(r'Serial\s+Number:\s*(\S+)', re.IGNORECASE),
+    re.compile(r'Serial\s*#?\s*:\s*(\S+)', re.IGNORECASE),
+)
+
+# Firmware version patterns, e.g. "SW: Version 08.0.95hT213"
+_FIRMWARE_PATTERNS = (
+    re.compile(r'SW:\s*Version\s+(\S+)', re.IGNORECASE),
+    re.compile(r'Software\s+Version:\s*(\S+)', re.IGNORECASE),
+)
+
+# Example: "System uptime is 2 days 3 hours 45 minutes"
+_UPTIME_RE = re.compile(r'uptime\s+is\s+(.+?)(?:\n|$)', re.IGNORECASE)
+
+# Example: "Management MAC: 94b3.4f30.4788"
+_CHASSIS_MAC_RE = re.compile(r'Management MAC:\s+([0-9a-fA-F]{4}\.[0-9a-fA-F]{4}\.[0-9a-fA-F]{4})')
+
+# Example: "hostname ICX8200-C08PF-POE-FNS4352T0D4"
+_HOSTNAME_RE = re.compile(r'hostname\s+(\S+)', re.IGNORECASE)
+
+# Hostname in a prompt like "SSH@ICX8200-C08PF-POE-FNS4352T0D4#", with a
+# fallback for other prompt formats; avoids capturing SSH@ in the hostname
+_PROMPT_HOSTNAME_PATTERNS = (
+    re.compile(r'SSH@([^#\$>\s]+)[#\$>]'),
+    re.compile(r'[@]([^@#\$>\s]+)[#\$>]'),
+)
+
+# Read-only commands behind the device info getters
+_VERSION_COMMAND = "show version"
+_CHASSIS_COMMAND = "show chassis | include Management"
+_HOSTNAME_COMMAND = "show running-config | include hostname"
+
+
+def _first_match(patterns, output: str) -> Optional[str]:
+    """Return the first group of the first pattern that matches output."""
+    for pattern in patterns:
+        match = pattern.search(output)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _strip_echo(output: str, command: str) -> str:
+    """Drop the shell's echo of command from the start of output."""
+    if command and output.startswith(command):
+        newline = output.find('\n', len(command))
+        return output[newline + 1:] if newline != -1 else ""
+    return output
+
+
 class DeviceInfo:
     """Mixin class for retrieving device information."""
     
-    def get_model(self) -> Optional[str]:
+    # Memoized device facts; the connection sets its own in __init__, these
+    # defaults keep the getters safe on any class the mixin is used with
+    hostname: Optional[str] = None
+    model: Optional[str] = None
+    serial: Optional[str] = None
+    chassis_mac: Optional[str] = None
+    
+    # Cached show version output, shared by the getters for fields that
+    # cannot change within a session (model, serial, firmware)
+    _version_output: Optional[str] = None
+    
+    # One-shot outputs fetched ahead of time by prefetch_device_info
+    _probe_outputs: Optional[Dict[str, str]] = None
+    
+    def invalidate(self) -> None:
         """
-        Get switch model from show version.
+        Drop cached command output that belongs to the current session.
         
+        Model, serial and the other memoized facts are kept, since they do
+        not change when the switch is reconnected.
+        """
+        self._version_output = None
+        self._probe_outputs = None
+    
+    def prefetch_device_info(self) -> None:
+        """
+        Fetch the output for all device info getters at once.
+        
+        The commands run side by side on exec channels, falling back to one
+        batched round-trip on the shell. The getters that follow (model, serial, chassis MAC, hostname) then
+        parse the prefetched output instead of each running a command.
+        """
+        commands = [_VERSION_COMMAND, _CHASSIS_COMMAND, _HOSTNAME_COMMAND]
+        outputs = {
+            command: output
+            for command, (success, output) in zip(commands, self.run_readonly_commands(commands))
+            if success
+        }
+        
+        version_output = outputs.pop(_VERSION_COMMAND, None)
+        if version_output is not None and self._version_output is None:
+            self._version_output = version_output
+        self._probe_outputs = outputs
+    
+    def _run_probe(self, command: str) -> Tuple[bool, str]:
+        """
+        Run a read-only command, using prefetched output when available.
+        
+        Args:
+            command: Command to execute.
+            
         Returns:
-            Switch model string or None if not found.
+            Tuple of (success, output).
         """
-        if hasattr(self, 'model') and self.model:
-            return self.model
+        if self._probe_outputs and command in self._probe_outputs:
+            return True, self._probe_outputs.pop(command)
+        return self.run_readonly_command(command)
+    
+    def _get_version_output(self, fresh: bool = False) -> Optional[str]:
+        """
+        Get show version output, running the command at most once.
+        
+        Args:
+            fresh: Run the command even if output is cached, for fields such
+                as uptime that change while the session is open.
             
-        success, output = self.run_command("show version")
+        Returns:
+            show version output or None if the command failed.
+        """
+        if self._version_output is not None and not fresh:
+            return self._version_output
+        
+        success, output = self.run_readonly_command(_VERSION_COMMAND)
         
         if not success:
             logger.error(f"Failed to get version info from switch {self.ip}")
             return None
         
-        # Parse model from output
-        # Example: "RUCKUS ICX7250-48P Router"
-        model_match = re.search(r'RUCKUS\s+(ICX\S+)', output, re.IGNORECASE)
-        if model_match:
-            self.model = model_match.group(1)
-            logger.debug(f"Detected model {self.model} for switch {self.ip}")
-            return self.model
+        self._version_output = output
+        return output
+    
+    def _get_model_and_serial(self) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Get switch model and serial number from a single show version.
         
-        # Pattern for ICX8200 format: "HW: Stackable ICX8200-C08PF-POE"
-        model_match = re.search(r'HW:\s+Stackable\s+(ICX\S+)', output, re.IGNORECASE)
-        if model_match:
-            self.model = model_match.group(1)
-            logger.debug(f"Detected model {self.model} for switch {self.ip}")
-            return self.model
+        Both fields live in the same output, so one command round-trip
+        populates self.model and self.serial together.
+        
+        Returns:
+            Tuple of (model, serial); either may be None if not found.
+        """
+        output = self._get_version_output()
+        
+        if output is None:
+            return self.model, self.serial
+        
+        if not self.model:
+            self.model = _first_match(_MODEL_PATTERNS, output)
+            if self.model:
+                logger.debug(f"Detected model {self.model} for switch {self.ip}")
+        
+        if not self.serial:
+            self.serial = _first_match(_SERIAL_PATTERNS, output)
+            if self.serial:
+                logger.debug(f"Detected serial {self.serial} for switch {self.ip}")
         
-        # Alternative pattern
-        model_match = re.search(r'System\s+Type:\s*(\S+)', output, re.IGNORECASE)
-        if model_match:
-            self.model = model_match.group(1)
-            logger.debug(f"Detected model {self.model} for switch {self.ip}")
+        return self.model, self.serial
+    
+    def get_model(self) -> Optional[str]:
+        """
+        Get switch model from show version.
+        
+        Returns:
+            Switch model string or None if not found.
+        """
+        if self.model:
             return self.model
         
-        logger.warning(f"Could not detect model for switch {self.ip}")
-        return None
+        model, _ = self._get_model_and_serial()
+        if not model:
+            logger.warning(f"Could not detect model for switch {self.ip}")
+        return model
     
     def get_serial(self) -> Optional[str]:
         """
@@ -59,32 +201,13 @@ class DeviceInfo:
         Returns:
             Serial number string or None if not found.
         """
-        if hasattr(self, 'serial') and self.serial:
-            return self.serial
-            
-        success, output = self.run_command("show version")
-        
-        if not success:
-            logger.error(f"Failed to get version info from switch {self.ip}")
-            return None
-        
-        # Parse serial from output
-        # Example: "Serial Number: ABC123456789"
-        serial_match = re.search(r'Serial\s+Number:\s*(\S+)', output, re.IGNORECASE)
-        if serial_match:
-            self.serial = serial_match.group(1)
-            logger.debug(f"Detected serial {self.serial} for switch {self.ip}")
-            return self.serial
-        
-        # Alternative pattern
-        serial_match = re.search(r'Serial\s*#?\s*:\s*(\S+)', output, re.IGNORECASE)
-        if serial_match:
-            self.serial = serial_match.group(1)
-            logger.debug(f"Detected serial {self.serial} for switch {self.ip}")
+        if self.serial:
             return self.serial
         
-        logger.warning(f"Could not detect serial number for switch {self.ip}")
-        return None
+        _, serial = self._get_model_and_serial()
+        if not serial:
+            logger.warning(f"Could not detect serial number for switch {self.ip}")
+        return serial
     
     def get_chassis_mac(self) -> Optional[str]:
         """
@@ -93,10 +216,10 @@ class DeviceInfo:
         Returns:
             Chassis MAC address or None if not found.
         """
-        if hasattr(self, 'chassis_mac') and self.chassis_mac:
+        if self.chassis_mac:
             return self.chassis_mac
             
-        success, output = self.run_command("show chassis | include Management")
+        success, output = self._run_probe(_CHASSIS_COMMAND)
         
         if not success:
             logger.error(f"Failed to get chassis info from switch {self.ip}")
@@ -104,7 +227,7 @@ class DeviceInfo:
             
         # Parse for management MAC
         # Example: Management MAC: 94b3.4f30.4788
-        mac_match = re.search(r'Management MAC:\s+([0-9a-fA-F]{4}\.[0-9a-fA-F]{4}\.[0-9a-fA-F]{4})', output)
+        mac_match = _CHASSIS_MAC_RE.search(output)
         
         if mac_match:
             self.chassis_mac = mac_match.group(1).lower()  # Normalize to lowercase
@@ -121,24 +244,14 @@ class DeviceInfo:
         Returns:
             Firmware version string or None if not found.
         """
-        success, output = self.run_command("show version")
+        output = self._get_version_output()
         
-        if not success:
-            logger.error(f"Failed to get version info from switch {self.ip}")
+        if output is None:
             return None
         
         # Parse firmware version
-        # Example: "SW: Version 08.0.95hT213"
-        version_match = re.search(r'SW:\s*Version\s+(\S+)', output, re.IGNORECASE)
-        if version_match:
-            version = version_match.group(1)
-            logger.debug(f"Detected firmware version {version} for switch {self.ip}")
-            return version
-        
-        # Alternative pattern
-        version_match = re.search(r'Software\s+Version:\s*(\S+)', output, re.IGNORECASE)
-        if version_match:
-            version = version_match.group(1)
+        version = _first_match(_FIRMWARE_PATTERNS, output)
+        if version:
             logger.debug(f"Detected firmware version {version} for switch {self.ip}")
             return version
         
@@ -149,18 +262,20 @@ class DeviceInfo:
         """
         Get system uptime.
         
+        Uptime changes while the session is open, so show version is always
+        run again; the fresh output also replaces the cached copy.
+        
         Returns:
             Uptime string or None if not found.
         """
-        success, output = self.run_command("show version")
+        output = self._get_version_output(fresh=True)
         
-        if not success:
-            logger.error(f"Failed to get version info from switch {self.ip}")
+        if output is None:
             return None
         
         # Parse uptime
         # Example: "System uptime is 2 days 3 hours 45 minutes"
-        uptime_match = re.search(r'uptime\s+is\s+(.+?)(?:\n|$)', output, re.IGNORECASE)
+        uptime_match = _UPTIME_RE.search(output)
         if uptime_match:
             uptime = uptime_match.group(1).strip()
             logger.debug(f"Detected uptime {uptime} for switch {self.ip}")
@@ -176,16 +291,18 @@ class DeviceInfo:
         Returns:
             Hostname string or None if not found.
         """
-        if hasattr(self, 'hostname') and self.hostname:
+        if self.hostname:
             return self.hostname
             
         # First try to get hostname from running config
-        success, output = self.run_command("show running-config | include hostname")
+        success, output = self._run_probe(_HOSTNAME_COMMAND)
+        # The echoed command itself ends in "hostname", so parse only what follows
+        output = _strip_echo(output, _HOSTNAME_COMMAND)
         
         if success and output.strip():
             # Parse hostname from output
             # Example: "hostname ICX8200-C08PF-POE-FNS4352T0D4"
-            hostname_match = re.search(r'hostname\s+(\S+)', output, re.IGNORECASE)
+            hostname_match = _HOSTNAME_RE.search(output)
             if hostname_match:
                 hostname = hostname_match.group(1)
                 # Clean up any SSH@ prefix that might be in the configured hostname
@@ -202,13 +319,8 @@ class DeviceInfo:
             prompt = self.connection.prompt
             if prompt:
                 # Extract hostname from prompt like "SSH@ICX8200-C08PF-POE-FNS4352T0D4#"
-                # Handle both SSH@hostname and avoid capturing SSH@ in the hostname
-                prompt_match = re.search(r'SSH@([^#\$>\s]+)[#\$>]', prompt)
-                if not prompt_match:
-                    # Fallback for other prompt formats
-                    prompt_match = re.search(r'[@]([^@#\$>\s]+)[#\$>]', prompt)
-                if prompt_match:
-                    hostname = prompt_match.group(1)
+                hostname = _first_match(_PROMPT_HOSTNAME_PATTERNS, prompt)
+                if hostname:
                     # Clean up any remaining SSH@ prefixes that might have been captured
                     if hostname.startswith('SSH@'):
                         hostname = hostname[4:]  # Remove 'SSH@' prefix
@@ -226,13 +338,8 @@ class DeviceInfo:
                 last_line = lines[-1]
                 logger.debug(f"Last line for prompt detection {self.ip}: {repr(last_line)}")
                 # Look for hostname pattern in the last line
-                # Handle both SSH@hostname and avoid capturing SSH@ in the hostname
-                prompt_match = re.search(r'SSH@([^#\$>\s]+)[#\$>]', last_line)
-                if not prompt_match:
-                    # Fallback for other prompt formats
-                    prompt_match = re.search(r'[@]([^@#\$>\s]+)[#\$>]', last_line)
-                if prompt_match:
-                    hostname = prompt_match.group(1)
+                hostname = _first_match(_PROMPT_HOSTNAME_PATTERNS, last_line)
+                if hostname:
                     logger.debug(f"Raw hostname from prompt for {self.ip}: {repr(hostname)}")
                     # Clean up any remaining SSH@ prefixes that might have been captured
                     if hostname.startswith('SSH@'):
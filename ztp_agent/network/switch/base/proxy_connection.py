@@ -4,7 +4,7 @@ This class can route SSH commands through an SSH proxy when configured.
 """
 import logging
 import asyncio
-from typing import Optional, Tuple, Any, Callable
+from typing import Optional, Tuple, Any, Callable, List
 from ztp_agent.network.switch.base.connection import BaseConnection
 
 # Set up logging
@@ -98,6 +98,42 @@ class ProxyAwareConnection(BaseConnection):
             # Fall back to direct SSH connection
             return super().run_command(command, expect_prompt)
     
+    def run_exec_commands(self, commands: List[str], timeout: Optional[float] = None) -> List[Tuple[bool, str]]:
+        """
+        Execute stateless commands, through the proxy when one is configured.
+        
+        Args:
+            commands: Commands to execute.
+            timeout: Time to wait for each command (direct connections only).
+            
+        Returns:
+            List of (success, output) tuples, one per command.
+        """
+        if self.ssh_executor:
+            # The proxy already runs each command on its own session
+            return [self.run_command(command) for command in commands]
+        else:
+            # Fall back to direct SSH connection
+            return super().run_exec_commands(commands, timeout)
+    
+    def run_commands(self, commands: List[str], timeout: Optional[float] = None) -> List[Tuple[bool, str]]:
+        """
+        Execute several commands, one proxy call each when a proxy is configured.
+        
+        Args:
+            commands: Commands to execute, in order.
+            timeout: Time to wait for the whole batch (direct connections only).
+            
+        Returns:
+            List of (success, output) tuples, one per command.
+        """
+        if self.ssh_executor:
+            # The proxy executes single commands, so batches cannot be pipelined
+            return [self.run_command(command) for command in commands]
+        else:
+            # Fall back to direct SSH connection
+            return super().run_commands(commands, timeout)
+    
     def connect(self) -> bool:
         """
         Establish connection - for proxy mode, this is a no-op since connections are per-command.
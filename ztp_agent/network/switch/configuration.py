@@ -3,7 +3,7 @@ Configuration module for RUCKUS ICX switches.
 """
 import logging
 import re
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from typing import TYPE_CHECKING
 
@@ -17,6 +17,21 @@ from ztp_agent.network.switch.enums import PortStatus, PoEStatus
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Example: "Port up, admin up, link up" from show interfaces
+_ADMIN_STATUS_RE = re.compile(r'admin (up|down)', re.IGNORECASE)
+
+# Example: "Member of 1 L2 VLANs, port is untagged, VLAN: 10"
+_PORT_VLAN_RE = re.compile(r'VLAN: (\d+)')
+
+# Most configuration lines sent per write, so a long block cannot overrun the
+# switch's input buffer or the per-batch read timeout
+_CONFIG_BATCH_SIZE = 50
+
+# Lines that enter a nested configuration level. A batch ends at each one, so
+# the lines that depend on it are only sent once the switch has accepted it
+# and never run at the wrong level.
+_CONTEXT_PREFIXES = ('interface ', 'vlan ')
+
 class SwitchConfiguration:
     """Class for switch configuration operations"""
     
@@ -29,6 +44,78 @@ class SwitchConfiguration:
         """
         self.connection = connection
     
+    def _run_batch(self, commands: List[str]) -> Optional[Tuple[str, str]]:
+        """
+        Run a block of configuration commands in as few round-trips as is safe.
+        
+        ICX accepts back-to-back configuration lines, so lines are sent
+        together and the output is checked per command afterwards. A write
+        ends after each line that enters a nested level (e.g. an interface),
+        and the rest of the block is only sent if that line was accepted.
+        No write carries more than _CONFIG_BATCH_SIZE lines.
+        
+        Args:
+            commands: Commands to execute, in order.
+            
+        Returns:
+            (command, output) of the first failed command, or None if all succeeded.
+        """
+        start = 0
+        while start < len(commands):
+            end = start
+            while (end < len(commands) - 1 and end - start < _CONFIG_BATCH_SIZE - 1
+                   and not commands[end].startswith(_CONTEXT_PREFIXES)):
+                end += 1
+            batch = commands[start:end + 1]
+            for command, (success, output) in zip(batch, self.connection.run_commands(batch)):
+                if not success:
+                    return command, output
+            start = end + 1
+        return None
+    
+    def _apply_config_block(self, commands: List[str], action: str,
+                            fallback: Optional[List[str]] = None) -> bool:
+        """
+        Apply a block of configuration commands and save it.
+        
+        Owns the whole configuration session: enters config mode, runs the
+        block in one round-trip, then saves on success or leaves config mode
+        without saving on any failure. exit_config_mode reads the current
+        prompt, so only the exits that are actually needed are sent.
+        
+        Args:
+            commands: Commands to execute, in order.
+            action: Description of the change for error messages.
+            fallback: Equivalent block to try in the same session if a line
+                of commands is rejected, e.g. for older firmware syntax. Only
+                used when the rejected line is not also part of the fallback,
+                which would fail the same way.
+            
+        Returns:
+            True if the block was applied and saved, False otherwise.
+        """
+        try:
+            if not self.connection.enter_config_mode():
+                return False
+            
+            failure = self._run_batch(commands)
+            if failure and fallback and failure[0] not in fallback:
+                logger.debug(f"'{failure[0]}' rejected while trying to {action}, retrying with fallback")
+                failure = self._run_batch(fallback)
+            if failure:
+                command, output = failure
+                logger.error(f"Failed to {action} at '{command}': {output}")
+                self.connection.exit_config_mode(save=False)
+                return False
+            
+            # Exit global config and save
+            return self.connection.exit_config_mode(save=True)
+            
+        except Exception as e:
+            logger.error(f"Error trying to {action}: {e}", exc_info=True)
+            self.connection.exit_config_mode(save=False)
+            return False
+    
     def apply_base_config(self, base_config: str) -> bool:
         """
         Apply base configuration to the switch.
@@ -48,21 +135,20 @@ class SwitchConfiguration:
             # Log that we're applying base configuration
             logger.info(f"Applying base configuration to switch (length: {len(base_config)})")
             logger.info(f"Base config content: {base_config[:500]}...")  # Log first 500 chars
-            if self.connection.debug and self.connection.debug_callback:
-                self.connection.debug_callback("Applying base configuration", color="yellow")
-            
-            # Split the configuration into lines and run each command
-            for line in base_config.strip().split('\n'):
-                # Skip empty lines and comments
-                line = line.strip()
-                if not line or line.startswith('!'):
-                    continue
-                    
-                # Run the command
-                success, output = self.connection.run_command(line)
-                if not success:
-                    logger.error(f"Failed to execute base config command '{line}': {output}")
-                    # We'll continue anyway to apply as much of the config as possible
+            self.connection._dbg("Applying base configuration", color="yellow")
+            
+            # Skip empty lines and comments, then send the rest in batches;
+            # a rejected line stops the base config and nothing is saved
+            commands = [
+                line for line in (raw.strip() for raw in base_config.splitlines())
+                if line and not line.startswith('!')
+            ]
+            failure = self._run_batch(commands)
+            if failure:
+                command, output = failure
+                logger.error(f"Failed to apply base configuration at '{command}': {output}")
+                self.connection.exit_config_mode(save=False)
+                return False
             
             # Save configuration
             if not self.connection.exit_config_mode(save=True):
@@ -89,56 +175,18 @@ class SwitchConfiguration:
         Returns:
             True if successful, False otherwise.
         """
-        try:
-            # Enter config mode
-            if not self.connection.enter_config_mode():
-                return False
-            
-            # Set hostname
-            success, output = self.connection.run_command(f"hostname {hostname}")
-            if not success:
-                logger.error(f"Failed to set hostname to {hostname}: {output}")
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Configure management interface
-            success, output = self.connection.run_command(f"interface ve {mgmt_vlan}")
-            if not success:
-                logger.error(f"Failed to configure management interface ve {mgmt_vlan}: {output}")
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Set IP address
-            success, output = self.connection.run_command(f"ip address {mgmt_ip} {mgmt_mask}")
-            if not success:
-                logger.error(f"Failed to set IP address {mgmt_ip} {mgmt_mask}: {output}")
-                self.connection.run_command("exit")  # Exit interface config
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Enable interface
-            success, output = self.connection.run_command("enable")
-            if not success:
-                logger.error(f"Failed to enable interface: {output}")
-                self.connection.run_command("exit")  # Exit interface config
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Exit interface config
-            self.connection.run_command("exit")
-            
-            # Exit global config and save
-            if not self.connection.exit_config_mode(save=True):
-                return False
-            
-            logger.info(f"Configured basic switch settings: hostname={hostname}, mgmt_vlan={mgmt_vlan}, mgmt_ip={mgmt_ip}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error configuring basic switch settings: {e}", exc_info=True)
-            self.connection.run_command("exit")  # Try to exit interface config
-            self.connection.run_command("exit")  # Try to exit global config
+        # Set hostname and bring up the management interface in one block
+        if not self._apply_config_block([
+            f"hostname {hostname}",
+            f"interface ve {mgmt_vlan}",
+            f"ip address {mgmt_ip} {mgmt_mask}",
+            "enable",
+            "exit",  # Exit interface config
+        ], "configure basic switch settings"):
             return False
+        
+        logger.info(f"Configured basic switch settings: hostname={hostname}, mgmt_vlan={mgmt_vlan}, mgmt_ip={mgmt_ip}")
+        return True
 
     def configure_super_user_password(self, password: str) -> bool:
         """
@@ -151,41 +199,19 @@ class SwitchConfiguration:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Enter config mode
-            if not self.connection.enter_config_mode():
-                return False
-            
-            logger.info(f"Configuring super user password on switch {self.connection.ip}")
-            
-            # Configure super user password 
-            success, output = self.connection.run_command(f"username super password {password}")
-            if not success:
-                logger.error(f"Failed to set super user password: {output}")
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Set super user privilege level
-            success, output = self.connection.run_command("username super privilege 0")
-            if not success:
-                logger.error(f"Failed to set super user privilege: {output}")
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Note: Not setting enable password as per user request
-            # RUCKUS ICX switches don't require enable passwords for super user
-            
-            # Exit config mode and save
-            if not self.connection.exit_config_mode(save=True):
-                return False
-            
-            logger.info(f"Successfully configured super user password on switch {self.connection.ip}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error configuring super user password: {e}", exc_info=True)
-            self.connection.run_command("exit")  # Try to exit config mode
+        logger.info(f"Configuring super user password on switch {self.connection.ip}")
+        
+        # Set the password and privilege level in one block
+        # Note: Not setting enable password as per user request
+        # RUCKUS ICX switches don't require enable passwords for super user
+        if not self._apply_config_block([
+            f"username super password {password}",
+            "username super privilege 0",
+        ], "configure super user password"):
             return False
+        
+        logger.info(f"Successfully configured super user password on switch {self.connection.ip}")
+        return True
 
     def configure_switch_port(self, port: str) -> bool:
         """
@@ -199,41 +225,16 @@ class SwitchConfiguration:
         Returns:
             True if successful, False otherwise.
         """
-        try:
-            # Enter config mode
-            if not self.connection.enter_config_mode():
-                return False
-            
-            # Configure port
-            success, output = self.connection.run_command(f"interface ethernet {port}")
-            if not success:
-                logger.error(f"Failed to enter interface config mode for {port}: {output}")
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Configure the port as a trunk with all VLANs
-            success, output = self.connection.run_command("vlan-config add all-tagged")
-            if not success:
-                logger.error(f"Failed to add all VLANs as tagged to port {port}: {output}")
-                self.connection.run_command("exit")  # Exit interface config
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Exit interface config
-            self.connection.run_command("exit")
-            
-            # Exit global config and save
-            if not self.connection.exit_config_mode(save=True):
-                return False
-            
-            logger.info(f"Configured port {port} as switch trunk port with all VLANs tagged")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error configuring switch port: {e}", exc_info=True)
-            self.connection.run_command("exit")  # Try to exit interface config
-            self.connection.run_command("exit")  # Try to exit global config
+        # Configure the port as a trunk with all VLANs
+        if not self._apply_config_block([
+            f"interface ethernet {port}",
+            "vlan-config add all-tagged",
+            "exit",  # Exit interface config
+        ], f"configure switch port {port}"):
             return False
+        
+        logger.info(f"Configured port {port} as switch trunk port with all VLANs tagged")
+        return True
 
     def configure_ap_port(self, port: str, wireless_vlans: List[int], management_vlan: int = 10) -> bool:
         """
@@ -249,50 +250,20 @@ class SwitchConfiguration:
         Returns:
             True if successful, False otherwise.
         """
-        try:
-            # Enter config mode
-            if not self.connection.enter_config_mode():
-                return False
-            
-            # Configure port
-            success, output = self.connection.run_command(f"interface ethernet {port}")
-            if not success:
-                logger.error(f"Failed to enter interface config mode for {port}: {output}")
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Add management VLAN to trunk
-            success, output = self.connection.run_command(f"vlan-config add tagged-vlan {management_vlan}")
-            if not success:
-                logger.error(f"Failed to add management VLAN {management_vlan} to port {port}: {output}")
-                self.connection.run_command("exit")  # Exit interface config
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Add wireless VLANs to trunk
-            for vlan in wireless_vlans:
-                success, output = self.connection.run_command(f"vlan-config add tagged-vlan {vlan}")
-                if not success:
-                    logger.error(f"Failed to add wireless VLAN {vlan} to port {port}: {output}")
-                    self.connection.run_command("exit")  # Exit interface config
-                    self.connection.exit_config_mode(save=False)
-                    return False
-            
-            # Exit interface config
-            self.connection.run_command("exit")
-            
-            # Exit global config and save
-            if not self.connection.exit_config_mode(save=True):
-                return False
-            
-            logger.info(f"Configured port {port} for AP with wireless VLANs {wireless_vlans} and management VLAN {management_vlan}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error configuring AP port: {e}", exc_info=True)
-            self.connection.run_command("exit")  # Try to exit interface config
-            self.connection.run_command("exit")  # Try to exit global config
+        # Tag the management and wireless VLANs with a single list command,
+        # falling back to one line per VLAN on firmware without list syntax
+        interface = f"interface ethernet {port}"
+        vlans = [management_vlan, *wireless_vlans]
+        vlan_list = " ".join(str(vlan) for vlan in vlans)
+        if not self._apply_config_block(
+            [interface, f"vlan-config add tagged-vlan {vlan_list}", "exit"],
+            f"configure AP port {port}",
+            fallback=[interface, *(f"vlan-config add tagged-vlan {vlan}" for vlan in vlans), "exit"],
+        ):
             return False
+        
+        logger.info(f"Configured port {port} for AP with wireless VLANs {wireless_vlans} and management VLAN {management_vlan}")
+        return True
 
     def set_hostname(self) -> bool:
         """
@@ -318,32 +289,13 @@ class SwitchConfiguration:
         hostname = f"{self.connection.model}-{self.connection.serial}"
         self.connection.hostname = hostname
         
-        try:
-            # Enter configuration mode
-            if not self.connection.enter_config_mode():
-                return False
-            
-            # Set hostname
-            if self.connection.debug and self.connection.debug_callback:
-                self.connection.debug_callback(f"Setting hostname to {hostname}", color="yellow")
-                
-            success, output = self.connection.run_command(f"hostname {hostname}", wait_time=1.0)
-            if not success:
-                logger.error(f"Failed to set hostname: {output}")
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Exit config mode and save
-            if not self.connection.exit_config_mode(save=True):
-                return False
-            
-            logger.info(f"Set hostname for switch {self.connection.ip} to {hostname}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error setting hostname: {e}", exc_info=True)
-            self.connection.run_command("exit")  # Try to exit config mode
+        # Set hostname
+        self.connection._dbg(f"Setting hostname to {hostname}", color="yellow")
+        if not self._apply_config_block([f"hostname {hostname}"], "set hostname"):
             return False
+        
+        logger.info(f"Set hostname for switch {self.connection.ip} to {hostname}")
+        return True
 
     def get_port_status(self, port: str) -> Optional[PortStatus]:
         """
@@ -361,7 +313,7 @@ class SwitchConfiguration:
             return None
         
         # Parse output
-        status_match = re.search(r'admin (up|down)', output, re.IGNORECASE)
+        status_match = _ADMIN_STATUS_RE.search(output)
         if status_match:
             status = status_match.group(1).lower()
             if status == 'up':
@@ -387,7 +339,7 @@ class SwitchConfiguration:
             return None
         
         # Parse output
-        vlan_match = re.search(r'VLAN: (\d+)', output)
+        vlan_match = _PORT_VLAN_RE.search(output)
         if vlan_match:
             return int(vlan_match.group(1))
         
@@ -427,41 +379,16 @@ class SwitchConfiguration:
         Returns:
             True if successful, False otherwise.
         """
-        try:
-            # Enter config mode
-            if not self.connection.enter_config_mode():
-                return False
-            
-            # Configure port
-            success, output = self.connection.run_command(f"interface ethernet {port}")
-            if not success:
-                logger.error(f"Failed to enter interface config mode for {port}: {output}")
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Set VLAN for access port
-            success, output = self.connection.run_command(f"vlan-config add untagged-vlan {vlan_id}")
-            if not success:
-                logger.error(f"Failed to set untagged VLAN {vlan_id} on port {port}: {output}")
-                self.connection.run_command("exit")  # Exit interface config
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Exit interface config
-            self.connection.run_command("exit")
-            
-            # Exit global config and save
-            if not self.connection.exit_config_mode(save=True):
-                return False
-            
-            logger.info(f"Changed port {port} VLAN to {vlan_id}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error changing port VLAN: {e}", exc_info=True)
-            self.connection.run_command("exit")  # Try to exit interface config
-            self.connection.run_command("exit")  # Try to exit global config
+        # Set VLAN for access port
+        if not self._apply_config_block([
+            f"interface ethernet {port}",
+            f"vlan-config add untagged-vlan {vlan_id}",
+            "exit",  # Exit interface config
+        ], f"change port {port} VLAN to {vlan_id}"):
             return False
+        
+        logger.info(f"Changed port {port} VLAN to {vlan_id}")
+        return True
 
     def set_port_status(self, port: str, status: PortStatus) -> bool:
         """
@@ -474,42 +401,16 @@ class SwitchConfiguration:
         Returns:
             True if successful, False otherwise.
         """
-        try:
-            # Enter config mode
-            if not self.connection.enter_config_mode():
-                return False
-            
-            # Configure port
-            success, output = self.connection.run_command(f"interface ethernet {port}")
-            if not success:
-                logger.error(f"Failed to enter interface config mode for {port}: {output}")
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Set status
-            cmd = status.value
-            success, output = self.connection.run_command(cmd)
-            if not success:
-                logger.error(f"Failed to set port {port} status to {status.value}: {output}")
-                self.connection.run_command("exit")  # Exit interface config
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Exit interface config
-            self.connection.run_command("exit")
-            
-            # Exit global config and save
-            if not self.connection.exit_config_mode(save=True):
-                return False
-            
-            logger.info(f"Set port {port} status to {status.value}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error setting port status: {e}", exc_info=True)
-            self.connection.run_command("exit")  # Try to exit interface config
-            self.connection.run_command("exit")  # Try to exit global config
+        # Set status
+        if not self._apply_config_block([
+            f"interface ethernet {port}",
+            status.value,
+            "exit",  # Exit interface config
+        ], f"set port {port} status to {status.value}"):
             return False
+        
+        logger.info(f"Set port {port} status to {status.value}")
+        return True
 
     def set_poe_status(self, port: str, status: PoEStatus) -> bool:
         """
@@ -522,42 +423,16 @@ class SwitchConfiguration:
         Returns:
             True if successful, False otherwise.
         """
-        try:
-            # Enter config mode
-            if not self.connection.enter_config_mode():
-                return False
-            
-            # Configure port
-            success, output = self.connection.run_command(f"interface ethernet {port}")
-            if not success:
-                logger.error(f"Failed to enter interface config mode for {port}: {output}")
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Set PoE status
-            cmd = f"inline power {status.value}"
-            success, output = self.connection.run_command(cmd)
-            if not success:
-                logger.error(f"Failed to set PoE status to {status.value} on port {port}: {output}")
-                self.connection.run_command("exit")  # Exit interface config
-                self.connection.exit_config_mode(save=False)
-                return False
-            
-            # Exit interface config
-            self.connection.run_command("exit")
-            
-            # Exit global config and save
-            if not self.connection.exit_config_mode(save=True):
-                return False
-            
-            logger.info(f"Set PoE status to {status.value} on port {port}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error setting PoE status: {e}", exc_info=True)
-            self.connection.run_command("exit")  # Try to exit interface config
-            self.connection.run_command("exit")  # Try to exit global config
+        # Set PoE status
+        if not self._apply_config_block([
+            f"interface ethernet {port}",
+            f"inline power {status.value}",
+            "exit",  # Exit interface config
+        ], f"set PoE status to {status.value} on port {port}"):
             return False
+        
+        logger.info(f"Set PoE status to {status.value} on port {port}")
+        return True
 
 
 # Module-level functions for monkey patching to SwitchOperation class
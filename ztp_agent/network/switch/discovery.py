@@ -4,7 +4,7 @@ Network discovery module for switch operations.
 import logging
 import re
 import time
-from typing import Dict, Tuple
+from typing import Dict, Set, Tuple
 
 from typing import TYPE_CHECKING
 
@@ -17,6 +17,71 @@ else:
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# show lldp neighbors detail fields, found in a single scan over the whole
+# output; the group name of each alternative is the neighbor key it populates.
+# Whitespace classes exclude newlines so no match spans two lines.
+# Example: "  + Chassis ID (MAC address): 94b3.4f30.4788"
+_LLDP_FIELD_RE = re.compile(
+    r'^(?:Local port: (?P<local_port>.+)'
+    r'|  \+ Chassis ID \([^)\n]+\): (?P<chassis_id>.+)'
+    r'|  \+ Port ID \([^)\n]+\): (?P<port_id>.+)'
+    r'|  \+ System name[^\S\n]+: "(?P<system_name>.+)"'
+    r'|  \+ System description[^\S\n]+: "(?P<system_description>.+)"'
+    r'|  \+ Port description[^\S\n]+: "(?P<port_description>.+)"'
+    r'|  \+ Management address \(IPv4\): (?P<mgmt_address>.+))',
+    re.MULTILINE,
+)
+
+# trace-l2 show hop line: "  1   1/1/1   IP  192.168.1.3  609c.9f1d.1a2b";
+# path header lines never match, so the hops are found in one scan. The
+# optional column carries its own trailing whitespace, so it cannot trade
+# characters with the separators around it when a line fails to match.
+_TRACE_HOP_RE = re.compile(
+    r'^  \d+[^\S\n]+(\S+)[^\S\n]+(?:\S+[^\S\n]+)?(\d+\.\d+\.\d+\.\d+)[^\S\n]+([0-9a-f.]+)',
+    re.MULTILINE,
+)
+
+# trace-l2 probes take a few seconds; poll for results at this interval, up
+# to the previous worst-case wait (5s settle plus two 3s retries)
+_TRACE_L2_POLL_INTERVAL = 0.5
+_TRACE_L2_TIMEOUT = 11.0
+
+# Once this long has passed, two polls in a row with the same results mean
+# the probe has finished, even if a wanted switch never showed up
+_TRACE_L2_MIN_WAIT = 2.0
+
+# How long trace-l2 results stay fresh enough to reuse for another LLDP scan
+_TRACE_L2_CACHE_TTL = 30.0
+
+# Session cache key for (time, MACs searched for, {mac: ip}) of the last trace
+_TRACE_L2_CACHE_KEY = 'trace_l2'
+
+
+def _device_type(text: str) -> str:
+    """
+    Classify an LLDP neighbor from its system name or description.
+    
+    ICX is checked first, so an ICX switch whose text also contains an
+    "R" (e.g. "RUCKUS ICX7150") is still reported as a switch.
+    
+    Args:
+        text: LLDP system name or description.
+        
+    Returns:
+        'switch', 'ap' or 'unknown'.
+    """
+    if 'ICX' in text:
+        return 'switch'
+    if 'AP' in text or 'R' in text:
+        return 'ap'
+    return 'unknown'
+
+
+def _needs_trace_address(info: Dict[str, str]) -> bool:
+    """Return True for a switch neighbor without a usable LLDP management address."""
+    return info.get('type') == 'switch' and info.get('mgmt_address', '0.0.0.0') in ('', '0.0.0.0')
+
+
 class SwitchDiscovery:
     """Class for switch discovery operations"""
     
@@ -37,7 +102,7 @@ class SwitchDiscovery:
             Tuple of (success, neighbors dictionary).
             neighbors dictionary format: {port: {field: value}}
         """
-        success, output = self.connection.run_command("show lldp neighbors detail")
+        success, output = self.connection.run_readonly_command("show lldp neighbors detail")
         
         if not success:
             return False, {}
@@ -45,144 +110,134 @@ class SwitchDiscovery:
         neighbors = {}
         current_port = None
         
-        # Parse output
-        for line in output.splitlines():
+        # Parse output in one scan, dispatching each match on its field name
+        for match in _LLDP_FIELD_RE.finditer(output):
+            field = match.lastgroup
+            value = match.group(field).strip()
+            
             # Check for port name
-            port_match = re.match(r'Local port: (.+)', line)
-            if port_match:
-                current_port = port_match.group(1).strip()
+            if field == 'local_port':
+                current_port = value
                 neighbors[current_port] = {}
                 continue
             
-            # Check for chassis ID
-            chassis_match = re.match(r'  \+ Chassis ID \([^)]+\): (.+)', line)
-            if chassis_match and current_port:
-                neighbors[current_port]['chassis_id'] = chassis_match.group(1).strip()
+            if not current_port:
                 continue
             
-            # Check for port ID
-            port_id_match = re.match(r'  \+ Port ID \([^)]+\): (.+)', line)
-            if port_id_match and current_port:
-                neighbors[current_port]['port_id'] = port_id_match.group(1).strip()
-                continue
+            neighbors[current_port][field] = value
+        
+        # Type each neighbor once the scan is done, preferring the system name
+        # and falling back to the description
+        for neighbor in neighbors.values():
+            system_name = neighbor.get('system_name')
+            system_desc = neighbor.get('system_description')
             
-            # Check for system name
-            system_name_match = re.match(r'  \+ System name\s+: "(.+)"', line)
-            if system_name_match and current_port:
-                system_name = system_name_match.group(1).strip()
-                neighbors[current_port]['system_name'] = system_name
-                
-                # Determine device type
-                if 'ICX' in system_name:
-                    neighbors[current_port]['type'] = 'switch'
-                elif 'AP' in system_name or 'R' in system_name:
-                    neighbors[current_port]['type'] = 'ap'
+            if system_name is not None:
+                neighbor['type'] = _device_type(system_name)
+            elif system_desc is not None:
+                neighbor['type'] = _device_type(system_desc)
+            
+            # Extract model for APs from system description
+            # Format: "Ruckus R350 Multimedia Hotzone Wireless AP/SW Version: 7.1.0.510.1041"
+            # We want to extract "R350" (2nd word)
+            if system_desc is not None and (
+                neighbor['type'] == 'ap' or
+                neighbor['type'] == 'unknown' and 'AP' in system_desc
+            ):
+                # Split system description and try to extract model (2nd word)
+                desc_parts = system_desc.split()
+                if len(desc_parts) >= 2 and desc_parts[0].lower() == 'ruckus':
+                    # Extract model from 2nd position (e.g., "R350", "R750", etc.)
+                    model = desc_parts[1]
+                    neighbor['model'] = model
+                    logger.debug(f"Extracted AP model '{model}' from system description: {system_desc}")
+                    # Update type to ap if it wasn't set
+                    if neighbor['type'] == 'unknown':
+                        neighbor['type'] = 'ap'
                 else:
-                    neighbors[current_port]['type'] = 'unknown'
-                continue
-                
-            # Check for system description
-            system_desc_match = re.match(r'  \+ System description\s+: "(.+)"', line)
-            if system_desc_match and current_port:
-                system_desc = system_desc_match.group(1).strip()
-                neighbors[current_port]['system_description'] = system_desc
-                
-                # If we couldn't determine type from system name, try from description
-                if 'type' not in neighbors[current_port]:
-                    if 'ICX' in system_desc:
-                        neighbors[current_port]['type'] = 'switch'
-                    elif 'AP' in system_desc or 'R' in system_desc:
-                        neighbors[current_port]['type'] = 'ap'
-                    else:
-                        neighbors[current_port]['type'] = 'unknown'
-                
-                # Extract model for APs from system description
-                # Format: "Ruckus R350 Multimedia Hotzone Wireless AP/SW Version: 7.1.0.510.1041"
-                # We want to extract "R350" (2nd word)
-                if (neighbors[current_port].get('type') == 'ap' or 
-                    neighbors[current_port].get('type') == 'unknown' and 'AP' in system_desc):
-                    
-                    # Split system description and try to extract model (2nd word)
-                    desc_parts = system_desc.split()
-                    if len(desc_parts) >= 2 and desc_parts[0].lower() == 'ruckus':
-                        # Extract model from 2nd position (e.g., "R350", "R750", etc.)
-                        model = desc_parts[1]
-                        neighbors[current_port]['model'] = model
-                        logger.debug(f"Extracted AP model '{model}' from system description: {system_desc}")
-                        # Update type to ap if it wasn't set
-                        if neighbors[current_port].get('type') == 'unknown':
-                            neighbors[current_port]['type'] = 'ap'
-                    else:
-                        logger.warning(f"Could not extract AP model from system description: {system_desc}")
-                
-                continue
-                
-            # Check for port description
-            port_desc_match = re.match(r'  \+ Port description\s+: "(.+)"', line)
-            if port_desc_match and current_port:
-                neighbors[current_port]['port_description'] = port_desc_match.group(1).strip()
-                continue
-                
-            # Check for management address
-            mgmt_addr_match = re.match(r'  \+ Management address \(IPv4\): (.+)', line)
-            if mgmt_addr_match and current_port:
-                mgmt_addr = mgmt_addr_match.group(1).strip()
-                neighbors[current_port]['mgmt_address'] = mgmt_addr
-                continue
+                    logger.warning(f"Could not extract AP model from system description: {system_desc}")
         
-        # For switches, use trace-l2 to get IP addresses
-        if any(n.get('type') == 'switch' for n in neighbors.values()):
-            # Run trace-l2 on VLAN 1 (default untagged VLAN on unconfigured switches)
-            success, _ = self.connection.run_command("trace-l2 vlan 1")
-            if success:
-                if self.connection.debug and self.connection.debug_callback:
-                    self.connection.debug_callback("Initiated trace-l2 on VLAN 1, waiting for completion...", color="yellow")
-                    
-                # Wait for the command to complete (trace probes take a few seconds)
-                time.sleep(5)
-                
-                # Get trace-l2 results
-                trace_attempts = 0
-                max_attempts = 3
-                ip_data = {}
-                trace_success = False
-                
-                while trace_attempts < max_attempts:
-                    trace_attempts += 1
-                    
-                    if self.connection.debug and self.connection.debug_callback:
-                        self.connection.debug_callback(f"Getting trace-l2 results (attempt {trace_attempts}/{max_attempts})...", color="yellow")
-                    
-                    trace_success, ip_data = self.get_l2_trace_data()
-                    
-                    # If we got data or reached max attempts, break
-                    if trace_success and ip_data:
-                        if self.connection.debug and self.connection.debug_callback:
-                            self.connection.debug_callback(f"Successfully retrieved trace-l2 data with {len(ip_data)} entries", color="green")
-                        break
-                    elif trace_attempts < max_attempts:
-                        # Wait a bit more before retrying
-                        time.sleep(3)
-                
-                if trace_success and ip_data:
-                    # Update neighbor information with IP addresses
-                    for port, info in neighbors.items():
-                        # If it's a switch and has no valid IP address from LLDP
-                        if info.get('type') == 'switch' and (
-                            'mgmt_address' not in info or 
-                            info.get('mgmt_address') == '0.0.0.0'
-                        ):
-                            # Try to find IP in trace-l2 data
-                            mac_addr = info.get('chassis_id')
-                            if mac_addr and mac_addr in ip_data:
-                                info['mgmt_address'] = ip_data[mac_addr]
-                                logger.info(f"Updated IP for switch at port {port} using trace-l2: {ip_data[mac_addr]}")
-                                
-                                if self.connection.debug and self.connection.debug_callback:
-                                    self.connection.debug_callback(f"Updated IP for switch at port {port}: {ip_data[mac_addr]}", color="green")
+        # For switches LLDP gave no address for, use trace-l2 to get IP addresses
+        wanted = {
+            info['chassis_id'] for info in neighbors.values()
+            if _needs_trace_address(info) and info.get('chassis_id')
+        }
+        if any(_needs_trace_address(n) for n in neighbors.values()):
+            ip_data = self._trace_switch_addresses(wanted)
+            
+            if ip_data:
+                # Update neighbor information with IP addresses
+                for port, info in neighbors.items():
+                    # If it's a switch and has no valid IP address from LLDP
+                    if _needs_trace_address(info):
+                        # Try to find IP in trace-l2 data
+                        mac_addr = info.get('chassis_id')
+                        if mac_addr and mac_addr in ip_data:
+                            info['mgmt_address'] = ip_data[mac_addr]
+                            logger.info(f"Updated IP for switch at port {port} using trace-l2: {ip_data[mac_addr]}")
+                            
+                            self.connection._dbg(f"Updated IP for switch at port {port}: {ip_data[mac_addr]}", color="green")
         
         return True, neighbors
 
+    def _trace_switch_addresses(self, wanted: Set[str]) -> Dict[str, str]:
+        """
+        Map switch MACs to IP addresses with trace-l2, reusing a recent trace.
+        
+        Results are kept in the connection's session cache for
+        _TRACE_L2_CACHE_TTL seconds, so back-to-back LLDP scans of the same
+        switch do not re-run the probe when the earlier trace already found
+        or searched for every wanted MAC. MACs it could not find are
+        remembered too, so a missing switch does not trigger a new probe.
+        
+        Args:
+            wanted: Chassis MACs of the switches that need an address.
+            
+        Returns:
+            Dictionary of {mac_address: ip_address}, empty if nothing was found.
+        """
+        cache = self.connection.session_cache()
+        cached = cache.get(_TRACE_L2_CACHE_KEY)
+        if cached:
+            traced_at, searched, ip_data = cached
+            if time.monotonic() - traced_at < _TRACE_L2_CACHE_TTL and wanted <= searched | ip_data.keys():
+                self.connection._dbg("Reusing recent trace-l2 results", color="green")
+                return ip_data
+        
+        # Run trace-l2 on VLAN 1 (default untagged VLAN on unconfigured switches)
+        success, _ = self.connection.run_command("trace-l2 vlan 1")
+        if not success:
+            return {}
+        
+        self.connection._dbg("Initiated trace-l2 on VLAN 1, waiting for completion...", color="yellow")
+        
+        # Poll the results until every unaddressed switch has been traced or
+        # the results settle, rather than sleeping for the worst-case probe time
+        ip_data = {}
+        previous = None
+        started = time.monotonic()
+        deadline = started + _TRACE_L2_TIMEOUT
+        
+        while time.monotonic() < deadline:
+            time.sleep(_TRACE_L2_POLL_INTERVAL)
+            
+            trace_success, trace_data = self.get_l2_trace_data()
+            if not trace_success:
+                continue
+            if trace_data:
+                ip_data = trace_data
+            if wanted <= ip_data.keys():
+                break
+            if trace_data == previous and time.monotonic() - started >= _TRACE_L2_MIN_WAIT:
+                break
+            previous = trace_data
+        
+        if ip_data:
+            self.connection._dbg(f"Successfully retrieved trace-l2 data with {len(ip_data)} entries", color="green")
+        cache[_TRACE_L2_CACHE_KEY] = (time.monotonic(), set(wanted), ip_data)
+        
+        return ip_data
+    
     def get_l2_trace_data(self) -> Tuple[bool, Dict[str, str]]:
         """
         Get L2 trace data using trace-l2 show command.
@@ -190,39 +245,25 @@ class SwitchDiscovery:
         Returns:
             Tuple of (success, {mac_address: ip_address}).
         """
-        success, output = self.connection.run_command("trace-l2 show")
+        success, output = self.connection.run_readonly_command("trace-l2 show")
         
         if not success:
             return False, {}
         
         # Parse the trace-l2 output
         ip_mac_map = {}
-        path_pattern = re.compile(r'path \d+ from (.+),')
-        hop_pattern = re.compile(r'  \d+\s+(\S+)\s+(?:\S+)?\s+(\d+\.\d+\.\d+\.\d+)\s+([0-9a-f\.]+)')
-        
-        current_path = None
         
-        for line in output.splitlines():
-            # Check for new path
-            path_match = path_pattern.match(line)
-            if path_match:
-                current_path = path_match.group(1).strip()
-                continue
-                
-            # Check for hop information
-            hop_match = hop_pattern.match(line)
-            if hop_match:
-                port, ip, mac = hop_match.groups()
-                mac = mac.lower()  # Normalize MAC address
+        for hop_match in _TRACE_HOP_RE.finditer(output):
+            port, ip, mac = hop_match.groups()
+            mac = mac.lower()  # Normalize MAC address
+            
+            # Store IP and MAC mapping
+            if ip != '0.0.0.0' and mac != '0000.0000.0000':
+                ip_mac_map[mac] = ip
                 
-                # Store IP and MAC mapping
-                if ip != '0.0.0.0' and mac != '0000.0000.0000':
-                    ip_mac_map[mac] = ip
-                    
-                    # Debug output
-                    if self.connection.debug and self.connection.debug_callback:
-                        self.connection.debug_callback(f"Found switch in trace-l2: MAC={mac}, IP={ip}", color="green")
-                        
+                # Debug output
+                self.connection._dbg(f"Found switch in trace-l2: MAC={mac}, IP={ip}", color="green")
+        
         return True, ip_mac_map
 
 
@@ -44,6 +44,11 @@ class SwitchOperation(BaseConnection, DeviceInfo):
     # Discovery methods will be attached via monkey patching in __init__.py
     # This preserves the existing pattern while using clean inheritance
     
+    def disconnect(self) -> None:
+        """Disconnect from the switch and drop output cached for the session."""
+        super().disconnect()
+        self.invalidate()
+    
     def __repr__(self) -> str:
         """String representation of the switch operation."""
         return f"SwitchOperation(ip='{self.ip}', connected={self.connected})"
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+Connection pool for reusing live switch sessions.
+"""
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from ztp_agent.network.switch.operation import SwitchOperation
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+def connect_many(specs: List[Dict[str, Any]], max_workers: int = 64,
+                 factory: Callable[..., SwitchOperation] = SwitchOperation) -> List[Optional[SwitchOperation]]:
+    """
+    Connect to many switches concurrently.
+    
+    SSH handshakes are network bound, so overlapping them on a thread pool
+    brings up N switches in roughly the time of the slowest one. Each
+    SwitchOperation owns its own client and transport, so the workers share
+    no connection state.
+    
+    Args:
+        specs: Keyword arguments for the factory, one dict per switch.
+        max_workers: Maximum number of concurrent connection attempts.
+        factory: Callable creating a new, unconnected switch operation.
+        
+    Returns:
+        Connected switch operations in the order of specs, with None for
+        switches that could not be reached.
+    """
+    def connect_one(spec: Dict[str, Any]) -> Optional[SwitchOperation]:
+        switch = factory(**spec)
+        return switch if switch.connect() else None
+    
+    if not specs:
+        return []
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(specs))) as executor:
+        return list(executor.map(connect_one, specs))
+
+
+class SwitchConnectionPool:
+    """
+    Pool of connected SwitchOperation instances keyed by (ip, username, password).
+    
+    Repeated operations against the same switch borrow an already
+    authenticated session instead of paying a new TCP and SSH handshake.
+    Sessions are handed back in user exec mode with nothing left unsaved,
+    so a borrower sees the same state as after a fresh connect.
+    """
+    
+    def __init__(self, max_idle_per_switch: int = 2,
+                 factory: Callable[..., SwitchOperation] = SwitchOperation):
+        """
+        Initialize connection pool.
+        
+        Args:
+            max_idle_per_switch: Idle sessions kept per (ip, username, password).
+            factory: Callable creating a new, unconnected switch operation.
+        """
+        self.max_idle_per_switch = max_idle_per_switch
+        self.factory = factory
+        self._pool: Dict[Tuple[str, str, str], Deque[SwitchOperation]] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _is_healthy(switch: SwitchOperation) -> bool:
+        """
+        Check that a pooled session is still usable.
+        
+        Args:
+            switch: Pooled switch operation.
+            
+        Returns:
+            True if the session is connected and its transport is alive.
+        """
+        if not switch.connected or not switch.ssh_client:
+            return False
+        
+        transport = switch.ssh_client.get_transport()
+        if transport is None or not transport.is_active():
+            return False
+        
+        try:
+            # Cheap heartbeat that the switch discards
+            transport.send_ignore()
+        except Exception:
+            return False
+        return True
+    
+    def _take_idle(self, key: Tuple[str, str, str]) -> Optional[SwitchOperation]:
+        """
+        Take a healthy idle session from the pool.
+        
+        Args:
+            key: Pool key (ip, username, password).
+            
+        Returns:
+            Pooled switch operation or None if none is available.
+        """
+        while True:
+            with self._lock:
+                idle = self._pool.get(key)
+                if not idle:
+                    return None
+                switch = idle.pop()
+            
+            if self._is_healthy(switch):
+                return switch
+            
+            logger.debug(f"Dropping stale pooled connection to switch {key[0]}")
+            switch.disconnect()
+    
+    def acquire(self, ip: str, username: str, password: str, **kwargs) -> Optional[SwitchOperation]:
+        """
+        Get a connected switch operation, reusing an idle session if possible.
+        
+        A switch that changed its password on first login is pooled under
+        the new one, so the preferred password is looked up as well.
+        
+        Args:
+            ip: Switch IP address.
+            username: SSH username.
+            password: SSH password.
+            **kwargs: Extra arguments for the factory when a new session is needed.
+            
+        Returns:
+            Connected switch operation, or None if the switch could not be reached.
+            Hand it back with release.
+        """
+        for candidate in (password, kwargs.get('preferred_password')):
+            if candidate:
+                switch = self._take_idle((ip, username, candidate))
+                if switch is not None:
+                    return switch
+        
+        switch = self.factory(ip, username, password, **kwargs)
+        return switch if switch.connect() else None
+    
+    def release(self, switch: SwitchOperation) -> None:
+        """
+        Return a session to the pool, closing it if it cannot be reused.
+        
+        Args:
+            switch: Switch operation to return.
+        """
+        if switch.connected and switch.reset_session():
+            with self._lock:
+                idle = self._pool.setdefault((switch.ip, switch.username, switch.password), deque())
+                if len(idle) < self.max_idle_per_switch:
+                    idle.append(switch)
+                    return
+        
+        switch.disconnect()
+    
+    @contextmanager
+    def borrow(self, ip: str, username: str, password: str, **kwargs) -> Iterator[SwitchOperation]:
+        """
+        Borrow a connected switch operation for the duration of a with block.
+        
+        Args:
+            ip: Switch IP address.
+            username: SSH username.
+            password: SSH password.
+            **kwargs: Extra arguments for the factory when a new session is needed.
+            
+        Yields:
+            Connected switch operation.
+            
+        Raises:
+            ConnectionError: If a new session cannot be established.
+        """
+        switch = self.acquire(ip, username, password, **kwargs)
+        if switch is None:
+            raise ConnectionError(f"Failed to connect to switch {ip}")
+        
+        try:
+            yield switch
+        except Exception:
+            # The session may be left mid-command, so do not reuse it
+            switch.disconnect()
+            raise
+        else:
+            self.release(switch)
+    
+    def prewarm(self, specs: List[Dict[str, Any]], max_workers: int = 64) -> int:
+        """
+        Open sessions to many switches concurrently and add them to the pool.
+        
+        Switches that already have an idle session are skipped, so calling
+        this before every pass only connects the ones that are missing.
+        
+        Args:
+            specs: Factory keyword arguments (ip, username, password, ...) per switch.
+            max_workers: Maximum number of concurrent connection attempts.
+            
+        Returns:
+            Number of new sessions opened.
+        """
+        with self._lock:
+            specs = [
+                spec for spec in specs
+                if not any(self._pool.get((spec['ip'], spec['username'], password))
+                           for password in (spec['password'], spec.get('preferred_password')))
+            ]
+        
+        connected = [switch for switch in connect_many(specs, max_workers, self.factory) if switch]
+        for switch in connected:
+            self.release(switch)
+        return len(connected)
+    
+    def close_all(self) -> None:
+        """Disconnect every idle session in the pool."""
+        with self._lock:
+            idle = [switch for sessions in self._pool.values() for switch in sessions]
+            self._pool.clear()
+        
+        for switch in idle:
+            switch.disconnect()
@@ -43,6 +43,11 @@ class ProxyAwareSwitchOperation(ProxyAwareConnection, DeviceInfo):
         
         logger.debug(f"Created ProxyAwareSwitchOperation for {ip}, SSH executor: {ssh_executor is not None}")
     
+    def disconnect(self) -> None:
+        """Disconnect from the switch and drop output cached for the session."""
+        super().disconnect()
+        self.invalidate()
+    
     def __repr__(self) -> str:
         """String representation of the proxy-aware switch operation."""
         proxy_mode = "proxy" if self.ssh_executor else "direct"
@@ -56,6 +56,12 @@ class ZTPProcess:
         self.debug = config.get('debug', False)
         self.debug_callback = config.get('debug_callback', None)
         
+        # Import here to avoid circular imports
+        from ztp_agent.network.switch.pool import SwitchConnectionPool
+        
+        # Live switch sessions reused across discovery and configuration passes
+        self.pool = SwitchConnectionPool()
+        
         proxy_mode = "proxy" if ssh_executor else "direct"
         logger.info(f"Initialized ZTP process with {proxy_mode} SSH mode")
     
@@ -109,6 +115,29 @@ class ZTPProcess:
                 
         return update_callback
     
+    def _acquire_switch(self, ip: str, username: str, password: str,
+                        preferred_password: Optional[str] = None):
+        """
+        Get a connected switch session from the pool.
+        
+        Args:
+            ip: Switch IP address.
+            username: SSH username.
+            password: SSH password.
+            preferred_password: Password to set on first login.
+            
+        Returns:
+            Connected switch operation or None if the switch could not be reached.
+            Hand it back with self.pool.release.
+        """
+        return self.pool.acquire(
+            ip, username, password,
+            preferred_password=preferred_password,
+            debug=self.debug,
+            debug_callback=self.debug_callback,
+            inventory_update_callback=self._create_inventory_update_callback()
+        )
+    
     def _set_device_configuring(self, ip: str, configuring: bool = True):
         """
         Mark a device as actively being configured.
@@ -201,7 +230,9 @@ class ZTPProcess:
                     logger.error(f"Failed to connect to switch {ip}")
                 return False
             
-            # Get model, serial, MAC address, and hostname by calling the methods
+            # Get model, serial, MAC address, and hostname by calling the methods;
+            # their show commands are fetched together in one round-trip first
+            switch_op.prefetch_device_info()
             model = switch_op.get_model()
             serial = switch_op.get_serial()
             mac = switch_op.get_chassis_mac()
@@ -429,6 +460,10 @@ class ZTPProcess:
         except Exception as e:
             logger.error(f"Unhandled error in ZTP process thread: {e}", exc_info=True)
             self.running = False
+        
+        finally:
+            # Close the sessions kept open between passes
+            self.pool.close_all()
     
     def _discover_devices(self) -> None:
         """
@@ -439,12 +474,24 @@ class ZTPProcess:
         """
         logger.debug("Running device discovery")
         
-        # Import here to avoid circular imports
-        from ztp_agent.network.switch import SwitchOperation
-        
         # Make a copy of the switches to avoid modifying during iteration
         switches_to_check = list(self.inventory['switches'].items())
         
+        # Bring up sessions to every switch at once, so the loop below does
+        # not pay one SSH handshake after another
+        self.pool.prewarm([
+            {
+                'ip': switch['ip'],
+                'username': switch['username'],
+                'password': switch['password'],
+                'preferred_password': switch.get('preferred_password'),
+                'debug': self.debug,
+                'debug_callback': self.debug_callback,
+                'inventory_update_callback': self._create_inventory_update_callback()
+            }
+            for _, switch in switches_to_check if switch.get('ip')
+        ])
+        
         # For each configured switch in our copy
         for mac, switch in switches_to_check:
             ip = switch.get('ip')
@@ -455,27 +502,18 @@ class ZTPProcess:
             try:
                 logger.debug(f"Checking for neighbors on switch {ip} (MAC: {mac})")
                 
-                # Create switch operation instance
-                switch_op = SwitchOperation(
-                    ip=ip,
-                    username=switch['username'],
-                    password=switch['password'],
-                    preferred_password=switch.get('preferred_password'),
-                    debug=self.debug,
-                    debug_callback=self.debug_callback,
-                    inventory_update_callback=self._create_inventory_update_callback()
-                )
-                
-                # Connect to switch
-                if not switch_op.connect():
+                # Connect to switch, reusing a pooled session when there is one
+                switch_op = self._acquire_switch(ip, switch['username'], switch['password'],
+                                                 switch.get('preferred_password'))
+                if switch_op is None:
                     logger.error(f"Failed to connect to switch {ip}")
                     continue
                 
                 # Get LLDP neighbors
                 success, neighbors = switch_op.get_lldp_neighbors()
                 
-                # Disconnect from switch
-                switch_op.disconnect()
+                # Hand the session back for the configuration pass
+                self.pool.release(switch_op)
                 
                 if not success:
                     logger.error(f"Failed to get LLDP neighbors from switch {ip}")
@@ -557,9 +595,6 @@ class ZTPProcess:
         """
         logger.debug("Configuring discovered devices")
         
-        # Import here to avoid circular imports
-        from ztp_agent.network.switch import SwitchOperation
-        
         # PART 1: Configure ports for discovered neighbors
         # Make a copy of switches to avoid modifying during iteration
         switches_to_configure = list(self.inventory['switches'].items())
@@ -634,17 +669,9 @@ class ZTPProcess:
                     
                     logger.debug(f"Trying to connect to switch {ip} for configuration with credentials {username}/{'*' * len(password)}")
                     
-                    switch_op = SwitchOperation(
-                        ip=ip,
-                        username=username,
-                        password=password,
-                        preferred_password=switch.get('preferred_password'),
-                        debug=self.debug,
-                        debug_callback=self.debug_callback,
-                        inventory_update_callback=self._create_inventory_update_callback()
-                    )
+                    switch_op = self._acquire_switch(ip, username, password, switch.get('preferred_password'))
                     
-                    if switch_op.connect():
+                    if switch_op is not None:
                         connected = True
                         # Update stored credentials if different
                         if username != switch['username'] or password != switch['password']:
@@ -703,6 +730,9 @@ class ZTPProcess:
                     mgmt_ip = ip
                     mgmt_mask = "255.255.255.0"  # Default mask
                 
+                # Base and basic configuration are saved together before disconnecting
+                switch_op.defer_saves = True
+                
                 # STEP 1: Apply base configuration (which includes VLAN creation with spanning tree) if not already applied
                 if not switch.get('base_config_applied', False):
                     self._set_device_configuring(ip, True)
@@ -712,7 +742,7 @@ class ZTPProcess:
                     if not success:
                         logger.error(f"Failed to configure VLANs on switch {ip}")
                         self._set_device_configuring(ip, False)
-                        switch_op.disconnect()
+                        self.pool.release(switch_op)
                         continue
                     
                     # Mark as base config applied
@@ -733,10 +763,14 @@ class ZTPProcess:
                 # Note: Password change is handled during first-time login connection
                 # RUCKUS ICX switches automatically save the new password during first login
                 
+                # Commit everything applied in this session with one write memory
+                if not switch_op.flush_config():
+                    success = False
+                
                 self._set_device_configuring(ip, False)
                 
-                # Disconnect from switch
-                switch_op.disconnect()
+                # Hand the session back to the pool
+                self.pool.release(switch_op)
                 
                 if success:
                     logger.info(f"Successfully configured switch {ip} with basic settings")
@@ -801,23 +835,16 @@ class ZTPProcess:
             logger.error(f"Could not find parent switch {switch_ip} in inventory")
             return
         
-        # Import here to avoid circular imports
-        from ztp_agent.network.switch import SwitchOperation
-        
         try:
             # Configure the port on the current switch as a trunk
-            switch_op = SwitchOperation(
-                ip=switch_ip,
-                username=parent_switch['username'],
-                password=parent_switch['password'],
-                preferred_password=parent_switch.get('preferred_password'),
-                debug=self.debug,
-                debug_callback=self.debug_callback,
-                inventory_update_callback=self._create_inventory_update_callback()
-            )
+            switch_op = self._acquire_switch(switch_ip, parent_switch['username'], parent_switch['password'],
+                                             parent_switch.get('preferred_password'))
             
             # Connect to parent switch
-            if switch_op.connect():
+            if switch_op is not None:
+                # Base config and the trunk port are saved together before disconnecting
+                switch_op.defer_saves = True
+                
                 # Check if we need to apply base configuration (only if not already configured)
                 if not parent_switch.get('base_config_applied', False):
                     logger.info(f"Applying base configuration to switch {switch_ip}")
@@ -825,7 +852,7 @@ class ZTPProcess:
                     
                     if not success:
                         logger.error(f"Failed to configure VLANs on switch {switch_ip}")
-                        switch_op.disconnect()
+                        self.pool.release(switch_op)
                         return
                     
                     # Mark as base config applied
@@ -835,13 +862,15 @@ class ZTPProcess:
                 
                 # Configure the port as a switch trunk with all-tagged                
                 success = switch_op.configure_switch_port(port)
+                if not switch_op.flush_config():
+                    success = False
                 if success:
                     logger.info(f"Configured port {port} on switch {switch_ip} as trunk for neighbor switch")
                 else:
                     logger.error(f"Failed to configure port {port} on switch {switch_ip} as trunk")
                 
-                # Disconnect from parent switch
-                switch_op.disconnect()
+                # Hand the parent switch session back to the pool
+                self.pool.release(switch_op)
                 
                 # Try to connect to the new switch with credential cycling
                 successfully_connected = False
@@ -864,17 +893,10 @@ class ZTPProcess:
                     
                     logger.info(f"Trying to connect to discovered switch {neighbor_ip} with credentials {username}/{'*' * len(password)}")
                     
-                    new_switch_op = SwitchOperation(
-                        ip=neighbor_ip,
-                        username=username,
-                        password=password,
-                        preferred_password=parent_switch.get('preferred_password'),
-                        debug=self.debug,
-                        debug_callback=self.debug_callback,
-                        inventory_update_callback=self._create_inventory_update_callback()
-                    )
+                    new_switch_op = self._acquire_switch(neighbor_ip, username, password,
+                                                         parent_switch.get('preferred_password'))
                     
-                    if new_switch_op.connect():
+                    if new_switch_op is not None:
                         # Successfully connected
                         successfully_connected = True
                         working_username = username
@@ -889,7 +911,7 @@ class ZTPProcess:
                         # Check if we got a MAC address for the new switch
                         if not new_switch_mac:
                             logger.error(f"Could not get MAC address for discovered switch {neighbor_ip}")
-                            new_switch_op.disconnect()
+                            self.pool.release(new_switch_op)
                             continue
                         
                         # Add the new switch to the inventory by MAC
@@ -929,8 +951,8 @@ class ZTPProcess:
                                 parent_switch_data['neighbors'][port]['mgmt_address'] = neighbor_ip
                                 logger.info(f"Updated neighbor IP for port {port} on parent switch {switch_ip}")
                         
-                        # Disconnect from new switch
-                        new_switch_op.disconnect()
+                        # Keep the new switch session for its configuration pass
+                        self.pool.release(new_switch_op)
                         
                         logger.info(f"Successfully connected to discovered switch {system_name} (IP: {neighbor_ip}, Model: {model}, Serial: {serial}) with credentials {working_username}/{'*' * len(working_password)}")
                         break
@@ -984,9 +1006,6 @@ class ZTPProcess:
             logger.error(f"Could not find parent switch {switch_ip} in inventory")
             return
         
-        # Import here to avoid circular imports
-        from ztp_agent.network.switch import SwitchOperation
-        
         try:
             # Try to connect with credential cycling
             connected = False
@@ -1020,17 +1039,10 @@ class ZTPProcess:
                 
                 logger.debug(f"Trying to connect to switch {switch_ip} for AP port config with credentials {username}/{'*' * len(password)}")
                 
-                switch_op = SwitchOperation(
-                    ip=switch_ip,
-                    username=username,
-                    password=password,
-                    preferred_password=parent_switch.get('preferred_password'),
-                    debug=self.debug,
-                    debug_callback=self.debug_callback,
-                    inventory_update_callback=self._create_inventory_update_callback()
-                )
+                switch_op = self._acquire_switch(switch_ip, username, password,
+                                                 parent_switch.get('preferred_password'))
                 
-                if switch_op.connect():
+                if switch_op is not None:
                     connected = True
                     # Update stored credentials if different
                     if username != parent_switch['username'] or password != parent_switch['password']:
@@ -1045,6 +1057,9 @@ class ZTPProcess:
                 mgmt_vlan = self.mgmt_vlan
                 wireless_vlans = self.wireless_vlans
                 
+                # Base config and the AP port are saved together before disconnecting
+                switch_op.defer_saves = True
+                
                 # Check if we need to apply base configuration (only if not already configured)
                 if not parent_switch.get('base_config_applied', False):
                     logger.info(f"Applying base configuration to switch {switch_ip}")
@@ -1052,7 +1067,7 @@ class ZTPProcess:
                     
                     if not success:
                         logger.error(f"Failed to configure VLANs on switch {switch_ip}")
-                        switch_op.disconnect()
+                        self.pool.release(switch_op)
                         return
                     
                     # Mark as base config applied
@@ -1064,6 +1079,8 @@ class ZTPProcess:
                 self._set_device_configuring(switch_ip, True)
                 logger.info(f"Configuring port {port} on switch {switch_ip} for AP {system_name}")
                 success = switch_op.configure_ap_port(port, wireless_vlans, mgmt_vlan)
+                if not switch_op.flush_config():
+                    success = False
                 self._set_device_configuring(switch_ip, False)
                 
                 if success:
@@ -1071,8 +1088,8 @@ class ZTPProcess:
                 else:
                     logger.error(f"Failed to configure port {port} on switch {switch_ip} for AP")
                 
-                # Disconnect from switch
-                switch_op.disconnect()
+                # Hand the session back to the pool
+                self.pool.release(switch_op)
                 
                 # Add the AP to our inventory if we have a MAC
                 if chassis_id: